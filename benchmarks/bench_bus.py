@@ -0,0 +1,94 @@
+"""
+Message throughput of bots running in the adapter process versus bots
+running as bus workers (`gamebot.bus`), measured from publishing a
+message on the adapter to its reply arriving on the adapter topic.
+
+Usage: python -m benchmarks.bench_bus [--messages N]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+from gamebot.adapters.blhblh import BlhBlhAdapter, Message
+from gamebot.bus import BusServer
+from gamebot.bots.coin_bot import CoinBot
+
+PLUGIN = 'coin_bot'
+
+
+def _messages(count: int) -> list[Message]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        Message(
+            user=f'user{i}', name=f'user{i}', text='!coin', age=30, gender='M',
+            likes=0, profile='p', time=now, source='bench',
+        )
+        for i in range(count)
+    ]
+
+
+async def _pump(adapter: BlhBlhAdapter, messages: list[Message]) -> float:
+    start = time.perf_counter()
+    for msg in messages:
+        await adapter._publish(msg)
+    for _ in messages:
+        await adapter.topic.get()
+    return time.perf_counter() - start
+
+
+async def in_process(messages: list[Message]) -> float:
+    adapter = BlhBlhAdapter('bench', 'bench', name='bench')
+    bot = CoinBot(subscription=adapter.subscribe(PLUGIN), topic=adapter.topic)
+    task = asyncio.create_task(bot.work())
+    try:
+        return await _pump(adapter, messages)
+    finally:
+        task.cancel()
+
+
+async def over_bus(messages: list[Message], credits: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bus.sock')
+        config_file = os.path.join(tmp, 'config.yaml')
+        with open(config_file, 'w') as f:
+            yaml.safe_dump({'plugins': [PLUGIN], 'bus': {'path': path, 'credits': credits}}, f)
+
+        adapter = BlhBlhAdapter('bench', 'bench', name='bench')
+        server = BusServer(adapter, path, [PLUGIN])
+        serve = asyncio.create_task(server.serve())
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable, '-m', 'gamebot.worker', PLUGIN,
+            env=dict(os.environ, GAMEBOT_CONFIG=config_file),
+            stdout=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            while PLUGIN not in server.connections:
+                await asyncio.sleep(0.01)
+            return await _pump(adapter, messages)
+        finally:
+            worker.terminate()
+            await worker.wait()
+            serve.cancel()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f'{args.messages} messages')
+    elapsed = await in_process(_messages(args.messages))
+    print(f'{"in-process":<18} {args.messages / elapsed:10.0f} msg/s')
+    for credits in (8, 32, 256):
+        elapsed = await over_bus(_messages(args.messages), credits)
+        print(f'{f"bus credits={credits}":<18} {args.messages / elapsed:10.0f} msg/s')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
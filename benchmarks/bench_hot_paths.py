@@ -0,0 +1,208 @@
+"""
+Microbenchmarks for the hot paths, compared against a stored baseline.
+
+    python -m benchmarks.bench_hot_paths                  # run and compare, exit 1 on regressions
+    python -m benchmarks.bench_hot_paths --threshold 10   # flag anything >10% slower (default 25)
+    python -m benchmarks.bench_hot_paths --save           # store the results as the new baseline
+    python -m benchmarks.bench_hot_paths -k blackjack     # only cases containing 'blackjack'
+
+The baseline lives in benchmarks/baseline.json. Timings are machine
+specific, so save a baseline on the machine you compare on.
+"""
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from gamebot.adapters.blhblh import BlhBlhAdapter, Message, PostMessage, Priority
+from gamebot.adapters.outbound import OutboundQueue
+from gamebot.bots.blackjack.blackjack_game import BlackjackGame
+from gamebot.bots.blackjack.blackjack_table import Shoe
+from gamebot.bots.stats.room_stats import RoomStats
+from gamebot.helper import calc_crc32_checksum, to_jpeg_data_uri
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+REPEATS = 9
+SUBSCRIBERS = 6
+# Messages per 'messages' event; the server always sends a window of recent
+# messages, so most of them are duplicates of the previous poll.
+WINDOW = 20
+
+
+@dataclasses.dataclass
+class Case:
+    name: str
+    # Untimed setup, returns the operation to time (sync or async)
+    make: Callable[[], Callable[[], Any]]
+    number: int
+    is_async: bool = False
+
+
+class NullSubscriber:
+    async def put(self, item):
+        pass
+
+
+def _message(i: int, start: datetime.datetime) -> dict[str, Any]:
+    return {
+        'user': f'user{i % 13}', 'name': f'User {i % 13}', 'text': f'message number {i}', 'age': 30,
+        'gender': 'F', 'likes': i % 5, 'profile': f'https://blhblh.be/p/{i % 13}',
+        'time': (start + datetime.timedelta(seconds=i)).isoformat(),
+    }
+
+
+def make_ingest(number: int) -> Callable[[], Any]:
+    adapter = BlhBlhAdapter('bench', 'bench')
+    adapter.only_after = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+    for i in range(SUBSCRIBERS):
+        adapter.subscribers[f'bot{i}'] = NullSubscriber()
+
+    start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    messages = [_message(i, start) for i in range(number + WINDOW)]
+    # Newest first, like the server sends them
+    payloads = iter([messages[i:i + WINDOW][::-1] for i in range(number)])
+    return lambda: adapter.handle_messages(next(payloads))
+
+
+def make_publish(number: int) -> Callable[[], Any]:
+    adapter = BlhBlhAdapter('bench', 'bench')
+    for i in range(SUBSCRIBERS):
+        adapter.subscribe(f'bot{i}')
+    msg = Message.model_validate(_message(0, datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)))
+    return lambda: adapter._publish(msg)
+
+
+def make_outbound() -> Callable[[], Any]:
+    queue = OutboundQueue()
+    replies = [
+        PostMessage(text='reply', priority=priority, sender=f'bot{i}')
+        for i in range(SUBSCRIBERS) for priority in Priority
+    ]
+
+    def put_get():
+        for reply in replies:
+            queue.put_nowait(reply)
+        while queue.qsize():
+            queue.get_nowait()
+    return put_get
+
+
+def make_room_stats(number: int) -> Callable[[], Any]:
+    room = RoomStats()
+    # Many distinct users, so the sketches keep evicting
+    events = iter([(1_760_000_000 + i, f'user{i % 997}', f'User {i % 997}', '!dice 2d6' if i % 4 else 'hello') for i in range(number)])
+    return lambda: room.add(*next(events))
+
+
+def make_finished_game() -> BlackjackGame:
+    game = BlackjackGame()
+    game.stand()
+    return game
+
+
+def cases() -> list[Case]:
+    images = {size: os.urandom(size * 1024) for size in (50, 500, 3072)}
+    hand = ['A', 'K', '5', 'A', '3']
+    game = BlackjackGame()
+    finished_game = make_finished_game()
+
+    result = [
+        Case('ingest.messages_event', lambda: make_ingest(2000), 2000, is_async=True),
+        Case('ingest.publish_fanout', lambda: make_publish(5000), 5000, is_async=True),
+        Case('outbound.put_get', make_outbound, 5000),
+        Case('stats.room_add', lambda: make_room_stats(20000), 20000),
+        Case('blackjack.deal', lambda: BlackjackGame, 5000),
+        Case('blackjack.deal_hit', lambda: lambda: BlackjackGame().hit(), 5000),
+        Case('blackjack.deal_stand', lambda: lambda: BlackjackGame().stand(), 5000),
+        Case('blackjack.shoe_draw', lambda: Shoe(decks=8).draw, 200),
+        Case('blackjack.hand_value', lambda: lambda: game._hand_value(hand), 50000),
+        Case('blackjack.status', lambda: game.status, 20000),
+        Case('blackjack.status_finished', lambda: finished_game.status, 20000),
+    ]
+    for size, data in images.items():
+        result.append(Case(f'post_message.base64_{size}kb', lambda data=data: lambda: to_jpeg_data_uri(data), max(10, 20000 // size)))
+    for size, data in images.items():
+        result.append(Case(f'crc32.{size}kb', lambda data=data: lambda: calc_crc32_checksum(data), max(10, 20000 // size)))
+    return result
+
+
+async def run_case(case: Case) -> float:
+    """
+    Best time per operation in nanoseconds. The minimum of several repeats
+    is the least noisy estimate, anything above it is interference.
+    """
+    samples = []
+    for _ in range(REPEATS):
+        op = case.make()
+        start = time.perf_counter()
+        if case.is_async:
+            for _ in range(case.number):
+                await op()
+        else:
+            for _ in range(case.number):
+                op()
+        samples.append((time.perf_counter() - start) / case.number * 1e9)
+    return min(samples)
+
+
+def _fmt(ns: float) -> str:
+    if ns >= 1e6:
+        return f'{ns / 1e6:9.2f}ms'
+    if ns >= 1e3:
+        return f'{ns / 1e3:9.2f}us'
+    return f'{ns:9.0f}ns'
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=25.0, help='allowed slowdown in percent')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('-k', dest='filter', default='', help='only run cases containing this text')
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())['results'] if args.baseline.exists() else {}
+    results: dict[str, float] = {}
+    regressions = []
+
+    print(f'{"case":<32} {"time/op":>11} {"baseline":>11} {"change":>8}')
+    for case in cases():
+        if args.filter not in case.name:
+            continue
+        results[case.name] = ns = await run_case(case)
+
+        line = f'{case.name:<32} {_fmt(ns):>11}'
+        if case.name in baseline:
+            change = (ns / baseline[case.name] - 1) * 100
+            flag = ''
+            if change > args.threshold:
+                flag = '  REGRESSION'
+                regressions.append(case.name)
+            line += f' {_fmt(baseline[case.name]):>11} {change:+7.1f}%{flag}'
+        print(line)
+
+    if args.save:
+        saved = baseline | results
+        args.baseline.write_text(json.dumps({
+            'python': sys.version.split()[0],
+            'machine': platform.machine(),
+            'results': {name: round(ns, 1) for name, ns in sorted(saved.items())},
+        }, indent=2) + '\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    if regressions:
+        print(f'{len(regressions)} regression(s) above {args.threshold:g}%: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
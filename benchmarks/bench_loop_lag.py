@@ -0,0 +1,84 @@
+"""
+Event loop lag while encoding images for `post_messages`, inline versus
+offloaded to the shared executor.
+
+A probe task sleeps 1ms in a loop and records how late it wakes up; that
+lateness is what every other bot and the Socket.IO heartbeat would see.
+
+Usage: python -m benchmarks.bench_loop_lag [--size-kb N] [--jobs N]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from gamebot.executor import ExecutorService
+from gamebot.helper import to_jpeg_data_uri
+
+PROBE_INTERVAL = 0.001
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+async def _measure(encode, images: list[bytes]) -> tuple[float, list[float]]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    for image in images:
+        await encode(image)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    return elapsed, lags
+
+
+def _report(label: str, elapsed: float, lags: list[float]) -> None:
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[int(len(lags_ms) * 0.99) - 1]
+    print(
+        f'{label:<22} total {elapsed * 1000:8.1f}ms  lag p50 {statistics.median(lags_ms):6.2f}ms'
+        f'  p99 {p99:6.2f}ms  max {lags_ms[-1]:6.2f}ms'
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-kb', type=int, default=3 * 1024)
+    parser.add_argument('--jobs', type=int, default=20)
+    args = parser.parse_args()
+
+    images = [os.urandom(args.size_kb * 1024) for _ in range(args.jobs)]
+    executor = ExecutorService(max_processes=2)
+
+    # Start the worker processes before measuring.
+    await executor.run_in_process_shm(to_jpeg_data_uri, b'warmup')
+
+    async def inline(image: bytes) -> str:
+        return to_jpeg_data_uri(image)
+
+    async def thread(image: bytes) -> str:
+        return await executor.run_in_thread(to_jpeg_data_uri, image)
+
+    async def process_shm(image: bytes) -> str:
+        return await executor.run_in_process_shm(to_jpeg_data_uri, image)
+
+    print(f'{args.jobs} images of {args.size_kb}KB')
+    for label, encode in (('inline', inline), ('thread pool', thread), ('process pool + shm', process_shm)):
+        _report(label, *await _measure(encode, images))
+
+    executor.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
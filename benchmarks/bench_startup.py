@@ -0,0 +1,121 @@
+"""
+Startup benchmark.
+
+Measures, each in a fresh interpreter:
+  * import time per plugin (on top of the already imported adapter)
+  * time from process start to the first 'fetchMessages' poll, with the
+    network replaced by an offline Socket.IO client
+
+Usage: python -m benchmarks.bench_startup [--runs N]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from gamebot.bots.registry import BUILTIN_PLUGINS
+
+
+def _child_import(plugin_name: str) -> None:
+    import gamebot.adapters.blhblh  # noqa: F401  shared by every bot, not attributed to a plugin
+    from gamebot.bots.registry import discover_plugins
+
+    plugin = discover_plugins()[plugin_name]
+    plugin.load()
+    print(plugin.import_time)
+
+
+def _child_first_poll() -> None:
+    import gamebot.main as app
+    from gamebot.adapters.blhblh import BlhBlhAdapter
+
+    class OfflineSio:
+        connected = False
+
+        def __init__(self, adapter: BlhBlhAdapter):
+            self.adapter = adapter
+
+        async def connect(self, *args, **kwargs):
+            self.connected = True
+            self.adapter.sio_connected_event.set()
+
+        async def emit(self, event, *args, **kwargs):
+            if event == 'fetchMessages':
+                print('first_poll', flush=True)
+                os._exit(0)
+
+        async def disconnect(self):
+            self.connected = False
+
+    class OfflineAdapter(BlhBlhAdapter):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.sio = OfflineSio(self)
+
+        async def _login(self) -> str:
+            return 'cookie=offline'
+
+    app.BlhBlhAdapter = OfflineAdapter
+    asyncio.run(app.main())
+
+
+def _run(args: list[str], env: dict[str, str] | None = None) -> tuple[float, str]:
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', *args],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return time.perf_counter() - start, out.strip().splitlines()[-1]
+
+
+def _first_poll(plugins: list[str], runs: int) -> list[float]:
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+        config = {'plugins': plugins}
+        config.update({name: {'whitelisted_users': ['bench']} for name in ('dog_bot', 'cat_bot', 'blackjack_bot')})
+        yaml.safe_dump(config, f)
+
+    env = dict(os.environ, GAMEBOT_CONFIG=f.name, blh_user='bench', blh_pw='bench')
+    try:
+        return [_run(['--child-first-poll'], env)[0] for _ in range(runs)]
+    finally:
+        os.unlink(f.name)
+
+
+def _fmt(samples: list[float]) -> str:
+    return f'median {statistics.median(samples) * 1000:8.1f}ms  min {min(samples) * 1000:8.1f}ms'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child-import')
+    parser.add_argument('--child-first-poll', action='store_true')
+    args = parser.parse_args()
+
+    if args.child_import:
+        return _child_import(args.child_import)
+    if args.child_first_poll:
+        return _child_first_poll()
+
+    print('Import time per plugin')
+    for name in BUILTIN_PLUGINS:
+        samples = [float(_run(['--child-import', name])[1]) for _ in range(args.runs)]
+        print(f'  {name:<16} {_fmt(samples)}')
+
+    print('Time to first poll')
+    scenarios = {
+        'all plugins': list(BUILTIN_PLUGINS),
+        'coin_bot+dice_bot': ['coin_bot', 'dice_bot'],
+    }
+    for label, plugins in scenarios.items():
+        print(f'  {label:<20} {_fmt(_first_poll(plugins, args.runs))}')
+
+
+if __name__ == '__main__':
+    main()
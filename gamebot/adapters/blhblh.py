@@ -6,16 +6,27 @@ import socketio.exceptions
 import pydantic
 import enum
 import datetime
+import time
 import logging # Import logging
+import collections
 from typing import Optional, Any
 from cachetools import LRUCache
-import base64
+
+from gamebot import metrics
+from gamebot.adapters.outbound import REPLY_TTL, OutboundQueue, Priority
+from gamebot.executor import DeadlineExceeded, ExecutorService, default_executor
+from gamebot.http_clients import HttpClients, default_http_clients
+from gamebot.recorder import Recorder
+from gamebot.helper import to_jpeg_data_uri
 
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 # By default, handlers are not attached, main.py will configure the root logger
 
+# Images above this size are base64 encoded off the event loop
+OFFLOAD_ENCODE_BYTES = 256 * 1024
+
 # --- Pydantic Models ---
 class Gender(enum.StrEnum):
     M = 'M'
@@ -31,13 +42,40 @@ class Message(pydantic.BaseModel):
     profile: str
     time: datetime.datetime
     pic: pydantic.HttpUrl | None = None
+    # Name of the adapter the message came in on, set by the adapter
+    source: str = ''
 
     def __hash__(self):
         return hash((self.user, self.text, self.profile, self.time, self.pic))
 
 class PostMessage(pydantic.BaseModel):
+    # Keep priority a plain int, so replies pack for the bot bus
+    model_config = pydantic.ConfigDict(use_enum_values=True)
+
     text: str
     pic: bytes | None = None
+    # Adapter to post to, bots copy this from the message they reply to
+    source: str = ''
+    # Defaults to IMAGE for replies with a picture and TEXT otherwise
+    priority: Priority = Priority.TEXT
+    # Unix time after which the reply is dropped, defaults to now + REPLY_TTL
+    deadline: float = 0.0
+    # Bot that sent the reply, set by the plugin registry
+    sender: str = ''
+
+    @pydantic.model_validator(mode='before')
+    @classmethod
+    def default_priority_and_deadline(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            data = dict(data)
+            if data.get('priority') is None:
+                data['priority'] = Priority.IMAGE if data.get('pic') is not None else Priority.TEXT
+            if not data.get('deadline'):
+                data['deadline'] = time.time() + REPLY_TTL[Priority(data['priority'])]
+        return data
+
+    def is_stale(self, now: float | None = None) -> bool:
+        return (time.time() if now is None else now) > self.deadline
 
 class AckResult(pydantic.BaseModel):
     result: str
@@ -60,16 +98,30 @@ class BlhBlhAdapter:
     and publishing messages to a PubSub instance.
     """
 
-    def __init__(self, username: str, password: str):
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        executor: ExecutorService | None = None,
+        name: str = 'blhblh',
+        outbound_maxsize: int = 0,
+        http: HttpClients | None = None,
+        recorder: Recorder | None = None,
+    ):
+        self.name = name
         self.username = username
         self.password = password
+        self.executor = executor or default_executor()
         self.cookie: Optional[str] = None
         self.sio = socketio.AsyncClient(logger=True)
         self.dedup_cache = LRUCache(maxsize=2**10)
         self.only_after = datetime.datetime.now(datetime.timezone.utc)
         self.subscribers: dict[str, asyncio.Queue] = {}
-        self.topic = asyncio.Queue()
-        self.http_client = httpx.Client()
+        self.topic = OutboundQueue(maxsize=outbound_maxsize)
+        self.counters = collections.Counter()
+        metrics.register(f'adapter.{name}', self.metrics)
+        self.http = http or default_http_clients()
+        self.recorder = recorder
         self.sio_connected_event = asyncio.Event()
         self.sio_connected_event.clear()
 
@@ -84,23 +136,7 @@ class BlhBlhAdapter:
             logger.info(f"BlhBlhAdapter: Disconnected from Socket.IO server. ({reason})")
             self.sio_connected_event.clear()
 
-        @self.sio.event
-        async def messages(data: list[dict[str, Any]]):
-            try:
-                parsed = [Message.model_validate(msg) for msg in data]
-                only_after = [msg for msg in parsed if msg.time > self.only_after]
-
-                for msg in sorted(only_after, key=lambda x: x.time):
-                    message_hash = hash(msg)
-                    if message_hash not in self.dedup_cache:
-                        self.dedup_cache[message_hash] = True
-                        await self._publish(msg)
-
-            except pydantic.ValidationError as e:
-                logger.error(f"BlhBlhAdapter: Pydantic validation error for event '{messages.__name__}': {e}", exc_info=True)
-            except Exception as e:
-                logger.error(f"BlhBlhAdapter: An unexpected error processing message event: {e}", exc_info=True)
-
+        self.sio.on('messages', self.handle_messages)
 
         @self.sio.on('onUserInfo')
         async def user_info_handler(data):
@@ -113,25 +149,50 @@ class BlhBlhAdapter:
             Handles incoming generic Socket.IO messages.
             Parses them and publishes valid Message events.
             """
-            print(event, sid, data)
+            logger.debug(f"BlhBlhAdapter: Generic message {event} {sid} {data}")
  
 
+    async def handle_messages(self, data: list[dict[str, Any]]):
+        """
+        Handles the 'messages' event: validates, drops old and already seen
+        messages and publishes the rest in order.
+        """
+        if self.recorder is not None:
+            self.recorder.record(self.name, 'messages', data)
+
+        try:
+            parsed = [Message.model_validate(msg) for msg in data]
+            only_after = [msg for msg in parsed if msg.time > self.only_after]
+
+            for msg in sorted(only_after, key=lambda x: x.time):
+                msg.source = self.name
+                message_hash = hash(msg)
+                if message_hash not in self.dedup_cache:
+                    self.dedup_cache[message_hash] = True
+                    await self._publish(msg)
+
+        except pydantic.ValidationError as e:
+            logger.error(f"BlhBlhAdapter: Pydantic validation error for event 'messages': {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"BlhBlhAdapter: An unexpected error processing message event: {e}", exc_info=True)
+
+
     async def _login(self) -> str:
         """
         Performs HTTP login to extract the cookie.
         """
-        async with httpx.AsyncClient() as http_client:
-            res = await http_client.post(
-                'https://blhblh.be/api/login',
-                json={
-                    'user': self.username,
-                    'password': self.password
-                },
-            )
-            res.raise_for_status() # Raise an exception for HTTP errors
-            self.cookie = '; '.join([f'{cookie_name}={cookie_value}' for cookie_name, cookie_value in http_client.cookies.items()])
-            logger.info("BlhBlhAdapter: Successfully logged in and extracted cookie.")
-            return self.cookie
+        res = await self.http.post(
+            'https://blhblh.be/api/login',
+            json={
+                'user': self.username,
+                'password': self.password
+            },
+        )
+        res.raise_for_status() # Raise an exception for HTTP errors
+        # The shared clients keep no cookies, take them from the response itself
+        self.cookie = '; '.join([f'{cookie_name}={cookie_value}' for cookie_name, cookie_value in res.cookies.items()])
+        logger.info("BlhBlhAdapter: Successfully logged in and extracted cookie.")
+        return self.cookie
         
 
     async def reconnect_task(self):
@@ -203,37 +264,44 @@ class BlhBlhAdapter:
         while True:
             post_msg: PostMessage = await self.topic.get()
 
+            await self.sio_connected_event.wait()
+
+            # Replies wait in the queue and for a reconnect, don't post them late
+            if post_msg.is_stale():
+                self.counters[f'stale_{Priority(post_msg.priority).name.lower()}'] += 1
+                logger.warning(f"BlhBlhAdapter: Dropping stale reply from '{post_msg.sender}', {time.time() - post_msg.deadline:.1f}s past its deadline.")
+                continue
+
             text, pic = post_msg.text, post_msg.pic
 
             initial_pic_data_for_emit = ''
 
             if pic is not None:
-                base64_image = base64.b64encode(pic).decode('utf-8')
-                initial_pic_data_for_emit = f'data:image/jpeg;base64,{base64_image}'
+                try:
+                    initial_pic_data_for_emit = await self._encode_pic(pic, deadline=post_msg.deadline)
+                except DeadlineExceeded:
+                    self.counters[f'stale_{Priority(post_msg.priority).name.lower()}'] += 1
+                    logger.warning(f"BlhBlhAdapter: Dropping reply from '{post_msg.sender}', its deadline passed while encoding the picture.")
+                    continue
+                except TimeoutError:
+                    self.counters['encode_timeouts'] += 1
+                    logger.warning(f"BlhBlhAdapter: Dropping reply from '{post_msg.sender}', encoding its picture timed out.")
+                    continue
 
                         
             ack_event = asyncio.Event()
+            ack_results: list[AckResult] = []
 
             def ack_handler(ack_response_event, data):
+                if self.recorder is not None:
+                    self.recorder.record(self.name, 'ack', [ack_response_event, data])
                 response_data_parsed = AckResult.model_validate(data, by_alias=True)
 
                 logger.info(f"BlhBlhAdapter: Server acknowledged 'postMessage' with: {response_data_parsed}")
-
-                if response_data_parsed.pic_url:
-                    upload_headers = {'Content-Type': 'image/jpeg'} # This is usually sufficient
-
-                    try:
-                        res = self.http_client.put(str(response_data_parsed.pic_url), content=pic, headers=upload_headers)
-                        res.raise_for_status()
-                        print('img uploaded')
-                    except httpx.RequestError as e:
-                        print('error', str(e))
-
+                ack_results.append(response_data_parsed)
                 ack_event.set()
             
 
-            await self.sio_connected_event.wait()
-            
             await self.sio.emit(
                 event='postMessage', 
                 data={
@@ -245,9 +313,35 @@ class BlhBlhAdapter:
             
             await asyncio.wait_for(ack_event.wait(), timeout=10)
 
+            if ack_results and ack_results[0].pic_url:
+                await self._upload_pic(str(ack_results[0].pic_url), pic)
+
+            self.counters['posted'] += 1
+
+    def metrics(self) -> dict[str, int]:
+        return {'posted': 0, **self.counters, **{f'queued_{name}': size for name, size in self.topic.sizes().items()}}
+
     
-    def subscribe(self, id: str) -> asyncio.Queue:
-        queue = asyncio.Queue()
+    async def _upload_pic(self, url: str, pic: bytes):
+        upload_headers = {'Content-Type': 'image/jpeg'} # This is usually sufficient
+
+        try:
+            res = await self.http.put(url, content=pic, headers=upload_headers)
+            res.raise_for_status()
+            logger.info('BlhBlhAdapter: Image uploaded.')
+        except httpx.HTTPError as e:
+            logger.error(f'BlhBlhAdapter: Image upload failed: {e}')
+
+
+    async def _encode_pic(self, pic: bytes, deadline: float | None = None) -> str:
+        if len(pic) < OFFLOAD_ENCODE_BYTES:
+            return to_jpeg_data_uri(pic)
+
+        return await self.executor.run_in_thread(to_jpeg_data_uri, pic, timeout=10, deadline=deadline)
+
+
+    def subscribe(self, id: str, queue: asyncio.Queue | None = None) -> asyncio.Queue:
+        queue = asyncio.Queue() if queue is None else queue
         self.subscribers[id] = queue
         return queue
 
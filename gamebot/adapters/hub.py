@@ -0,0 +1,64 @@
+# hub.py
+import asyncio
+import logging
+
+from gamebot.adapters.blhblh import BlhBlhAdapter, PostMessage
+
+logger = logging.getLogger(__name__)
+
+
+class AdapterHub:
+    """
+    Fans messages from several adapters (accounts / rooms) into one shared
+    set of bots and routes each reply back to the adapter it came from.
+
+    Bots see the same interface as a single adapter: `subscribe()` and a
+    `topic` queue to put replies on. Every adapter keeps its own outbound
+    queue, so a slow room only backs up its own replies.
+    """
+
+    def __init__(self, adapters: list[BlhBlhAdapter]) -> None:
+        if not adapters:
+            raise ValueError('AdapterHub needs at least one adapter.')
+
+        self.adapters: dict[str, BlhBlhAdapter] = {}
+        for adapter in adapters:
+            if adapter.name in self.adapters:
+                raise ValueError(f"Duplicate adapter name '{adapter.name}'")
+            self.adapters[adapter.name] = adapter
+
+        self.topic = asyncio.Queue()
+        self.dropped: dict[str, int] = {name: 0 for name in self.adapters}
+
+    def subscribe(self, id: str) -> asyncio.Queue:
+        # One queue shared by every adapter, so a bot sees all rooms.
+        queue = asyncio.Queue()
+        for adapter in self.adapters.values():
+            adapter.subscribe(id, queue)
+        return queue
+
+    def unsubscribe(self, id: str) -> bool:
+        removed = [adapter.unsubscribe(id) for adapter in self.adapters.values()]
+        return any(removed)
+
+    def _target(self, post_msg: PostMessage) -> BlhBlhAdapter | None:
+        adapter = self.adapters.get(post_msg.source)
+        if adapter is None and len(self.adapters) == 1:
+            # Replies without a source still work with a single adapter.
+            adapter = next(iter(self.adapters.values()))
+        return adapter
+
+    async def route_replies(self):
+        while True:
+            post_msg: PostMessage = await self.topic.get()
+
+            adapter = self._target(post_msg)
+            if adapter is None:
+                logger.warning(f"AdapterHub: No adapter '{post_msg.source}' for reply, dropping it.")
+                continue
+
+            # Never wait on one room: drop its least important reply instead.
+            dropped = adapter.topic.put_dropping(post_msg)
+            if dropped is not None:
+                self.dropped[adapter.name] += 1
+                logger.warning(f"AdapterHub: Outbound queue of '{adapter.name}' full, dropped a reply from '{dropped.sender}'.")
@@ -0,0 +1,126 @@
+# outbound.py
+import asyncio
+import collections
+import enum
+from typing import Any
+
+
+class Priority(enum.IntEnum):
+    """Outbound priority classes, lower values are posted first."""
+    INTERACTIVE = 0  # game turns somebody is waiting for
+    TEXT = 1         # other text replies
+    IMAGE = 2        # replies with a picture, slow to encode and upload
+
+
+# Seconds a reply stays worth posting, per priority class
+REPLY_TTL = {
+    Priority.INTERACTIVE: 30.0,
+    Priority.TEXT: 60.0,
+    Priority.IMAGE: 120.0,
+}
+
+
+class _Lanes:
+    """
+    Storage of `OutboundQueue`: one lane per priority class, and within a
+    lane one FIFO per sender served round robin, so a chatty bot can not
+    starve the others of the same class.
+    """
+
+    def __init__(self) -> None:
+        self._lanes: dict[Priority, collections.OrderedDict[str, collections.deque]] = {
+            priority: collections.OrderedDict() for priority in sorted(Priority)
+        }
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return repr(self.sizes())
+
+    def append(self, item: Any) -> None:
+        lane = self._lanes[item.priority]
+        lane.setdefault(item.sender, collections.deque()).append(item)
+        self._len += 1
+
+    def _pop_from(self, lane: collections.OrderedDict[str, collections.deque]) -> Any:
+        sender, items = next(iter(lane.items()))
+        item = items.popleft()
+        if items:
+            lane.move_to_end(sender)
+        else:
+            del lane[sender]
+        self._len -= 1
+        return item
+
+    def popleft(self) -> Any:
+        for lane in self._lanes.values():
+            if lane:
+                return self._pop_from(lane)
+        raise IndexError('pop from empty queue')
+
+    def lowest_priority(self) -> Priority | None:
+        for priority, lane in reversed(self._lanes.items()):
+            if lane:
+                return priority
+        return None
+
+    def pop_lowest(self) -> Any:
+        """
+        Removes an item of the lowest non-empty priority class: the oldest
+        one of the sender with the most items queued in that class.
+        """
+        for lane in reversed(self._lanes.values()):
+            if lane:
+                sender = max(lane, key=lambda sender: len(lane[sender]))
+                items = lane[sender]
+                item = items.popleft()
+                if not items:
+                    del lane[sender]
+                self._len -= 1
+                return item
+        raise IndexError('pop from empty queue')
+
+    def clear(self) -> None:
+        for lane in self._lanes.values():
+            lane.clear()
+        self._len = 0
+
+    def sizes(self) -> dict[str, int]:
+        return {
+            priority.name.lower(): sum(len(items) for items in lane.values())
+            for priority, lane in self._lanes.items()
+        }
+
+
+class OutboundQueue(asyncio.Queue):
+    """
+    Reply queue of an adapter, ordered by `Priority` and fair between
+    senders. Items need `priority` and `sender` attributes (see PostMessage).
+    Deadlines are enforced by the consumer, right before posting.
+    """
+
+    def _init(self, maxsize: int) -> None:
+        self._queue = _Lanes()
+
+    def put_dropping(self, item: Any) -> Any | None:
+        """
+        Like `put_nowait`, but a full queue drops its least important reply
+        instead of raising: the new one if everything queued has a higher
+        priority, else one of the lowest class (see `_Lanes.pop_lowest`).
+        Returns the dropped reply, None if nothing was dropped.
+        """
+        if not self.full():
+            self.put_nowait(item)
+            return None
+
+        lowest = self._queue.lowest_priority()
+        if lowest is None or item.priority > lowest:
+            return item
+        dropped = self._queue.pop_lowest()
+        self.put_nowait(item)
+        return dropped
+
+    def sizes(self) -> dict[str, int]:
+        return self._queue.sizes()
@@ -2,60 +2,143 @@
 
 
 import asyncio
-from gamebot.adapters.blhblh import Message, PostMessage
+from gamebot.adapters.blhblh import Message, PostMessage, Priority
 import logging
 
 from gamebot.bots.blackjack.blackjack_game import BlackjackGame
+from gamebot.bots.blackjack.blackjack_table import BlackjackTable, Phase, TableConfig
+from gamebot.bots.config import WhitelistConfig
 
 
+class BlackjackConfig(WhitelistConfig):
+    # Multiplayer tables instead of one game per player, see blackjack_table
+    table: TableConfig | None = None
+
 
 class BlackjackBot():
 
+    config_model = BlackjackConfig
+
     def __init__(
         self, 
-        whitelisted_users: set[str],
+        whitelisted_users: frozenset[str],
         subscription: asyncio.Queue,
         topic: asyncio.Queue,
+        table: TableConfig | None = None,
     ) -> None:
         self.whitelisted_users = whitelisted_users
         self.subscription = subscription
         self.topic = topic
-        self.running_games: dict[str, BlackjackGame] = {}
+        self.table_config = table
+        # Keyed by (adapter, user), the same user may play in several rooms
+        self.running_games: dict[tuple[str, str], BlackjackGame] = {}
+        # Table mode: one table per adapter
+        self.tables: dict[str, BlackjackTable] = {}
+
+    @classmethod
+    def from_config(cls, config: BlackjackConfig, subscription: asyncio.Queue, topic: asyncio.Queue) -> 'BlackjackBot':
+        return cls(
+            whitelisted_users=config.whitelisted_users,
+            subscription=subscription,
+            topic=topic,
+            table=config.table,
+        )
+
+    def reconfigure(self, config: BlackjackConfig):
+        # Running games and tables keep going, a new table config applies to tables opened later
+        self.whitelisted_users = config.whitelisted_users
+        self.table_config = config.table
 
 
     async def work(self):
 
         while True:
-            msg: Message = await self.subscription.get()
-
-            if msg.user not in self.whitelisted_users or not msg.text.startswith('!blackjack'):
-                continue
-            
-            commands = msg.text.removeprefix('!blackjack').strip().lower()
-            current_game = self.running_games.get(msg.user)
-
-            match commands:
-                case 'hit' if current_game is not None:
-                    state_text = current_game.hit()
-
-                case 'stand' if current_game is not None:
-                    state_text = current_game.stand()
-
-                case '' if current_game is not None:
-                    state_text = f'You have a running game. Use "!blackjack hit/stand" to play.\n{current_game.status()}'
-
-                case '' if current_game is None:
-                    new_game = BlackjackGame()
-                    self.running_games[msg.user] = new_game
-                    state_text = new_game.status()
-                    
-                case _:
-                    state_text = 'Invalid command. Use "!blackjack" to start a game and "!blackjack hit/stand" to play.'                    
-
-
-            response_text = f'{msg.name}: {state_text}'
-
-            if current_game is not None and current_game.is_finished():
-                self.running_games.pop(msg.user, None)
-            post_msg = PostMessage(text=response_text, pic=None)
-            await self.topic.put(post_msg)
\ No newline at end of file
+            msg = await self._next_message()
+
+            if msg is not None and msg.user in self.whitelisted_users and msg.text.startswith('!blackjack'):
+                if self.table_config is None:
+                    await self._play_game(msg)
+                else:
+                    await self._play_table(msg)
+
+            await self._close_rounds()
+
+    async def _next_message(self) -> Message | None:
+        """Waits for the next message, or returns None once a table round is due."""
+        deadlines = [table.deadline for table in self.tables.values() if table.deadline is not None]
+        if not deadlines:
+            return await self.subscription.get()
+
+        timeout = max(0.0, min(deadlines) - asyncio.get_running_loop().time())
+        try:
+            return await asyncio.wait_for(self.subscription.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def _post(self, text: str, source: str):
+        post_msg = PostMessage(text=text, pic=None, source=source, priority=Priority.INTERACTIVE)
+        await self.topic.put(post_msg)
+
+    async def _play_table(self, msg: Message):
+        commands = msg.text.removeprefix('!blackjack').strip().lower()
+        now = asyncio.get_running_loop().time()
+        table = self.tables.get(msg.source)
+        if table is None:
+            table = self.tables[msg.source] = BlackjackTable.from_config(self.table_config)
+
+        # Actions are collected silently, the table posts once per round
+        match commands:
+            case '' | 'join':
+                reply = table.join(msg.user, msg.name, now)
+
+            case 'hit' | 'stand':
+                reply = None if table.act(msg.user, commands, now) else 'You are not at the table. Use "!blackjack join" to sit down.'
+
+            case 'leave':
+                table.leave(msg.user, now)
+                reply = None
+
+            case _:
+                reply = 'Invalid command. Use "!blackjack join" to sit down, "!blackjack hit/stand" to play and "!blackjack leave" to get up.'
+
+        if reply is not None:
+            await self._post(f'{msg.name}: {reply}', msg.source)
+
+    async def _close_rounds(self):
+        now = asyncio.get_running_loop().time()
+        for source, table in list(self.tables.items()):
+            text = table.tick(now)
+            if text is not None:
+                await self._post(text, source)
+            if table.phase is Phase.IDLE:
+                del self.tables[source]
+
+    async def _play_game(self, msg: Message):
+        commands = msg.text.removeprefix('!blackjack').strip().lower()
+        game_key = (msg.source, msg.user)
+        current_game = self.running_games.get(game_key)
+
+        match commands:
+            case 'hit' if current_game is not None:
+                state_text = current_game.hit()
+
+            case 'stand' if current_game is not None:
+                state_text = current_game.stand()
+
+            case '' if current_game is not None:
+                state_text = f'You have a running game. Use "!blackjack hit/stand" to play.\n{current_game.status()}'
+
+            case '' if current_game is None:
+                new_game = BlackjackGame()
+                self.running_games[game_key] = new_game
+                state_text = new_game.status()
+                
+            case _:
+                state_text = 'Invalid command. Use "!blackjack" to start a game and "!blackjack hit/stand" to play.'                    
+
+
+        response_text = f'{msg.name}: {state_text}'
+
+        if current_game is not None and current_game.is_finished():
+            self.running_games.pop(game_key, None)
+        await self._post(response_text, msg.source)
\ No newline at end of file
@@ -1,5 +1,25 @@
 import random
 
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+
+def hand_value(hand):
+    value = 0
+    aces = 0
+    for card in hand:
+        if card in ['J', 'Q', 'K']:
+            value += 10
+        elif card == 'A':
+            aces += 1
+            value += 11
+        else:
+            value += int(card)
+    while value > 21 and aces:
+        value -= 10
+        aces -= 1
+    return value
+
+
 class BlackjackGame:
     def __init__(self):
         self.deck = self._create_deck()
@@ -10,8 +30,7 @@ class BlackjackGame:
         self._deal_initial_cards()
 
     def _create_deck(self):
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        deck = ranks * 4
+        deck = RANKS * 4
         random.shuffle(deck)
         return deck
 
@@ -27,21 +46,7 @@ class BlackjackGame:
             self.finished = True
             self.message = "Blackjack! You win!"
 
-    def _hand_value(self, hand):
-        value = 0
-        aces = 0
-        for card in hand:
-            if card in ['J', 'Q', 'K']:
-                value += 10
-            elif card == 'A':
-                aces += 1
-                value += 11
-            else:
-                value += int(card)
-        while value > 21 and aces:
-            value -= 10
-            aces -= 1
-        return value
+    _hand_value = staticmethod(hand_value)
 
     def hit(self):
         if self.finished:
@@ -0,0 +1,304 @@
+# blackjack_table.py
+"""
+Multiplayer blackjack: one table per room, dealt from a shared multi-deck
+shoe. Play runs in rounds, each one a time window that ends with a single
+post showing the whole table:
+
+  join  the first "!blackjack join" opens the table, everybody who joins
+        within the join window is dealt in when it closes
+  act   every player still in sends "!blackjack hit" or "!blackjack stand",
+        the window closes early once all of them have acted and no action
+        counts as stand
+
+After the last act round the dealer plays and the post shows every outcome.
+Players stay seated for the next hand until they "!blackjack leave" or sit
+through a hand without acting.
+
+The table never reads the clock itself, callers pass `now` (loop time) and
+call `tick()` once `deadline` has passed.
+"""
+import array
+import dataclasses
+import enum
+import random
+
+import pydantic
+
+from gamebot.bots.blackjack.blackjack_game import RANKS, hand_value
+
+
+class TableConfig(pydantic.BaseModel):
+    decks: int = pydantic.Field(6, ge=1, le=8)
+    # Share of the shoe dealt before it is reshuffled, checked between hands
+    penetration: float = pydantic.Field(0.75, gt=0, lt=1)
+    join_window: float = 15.0
+    act_window: float = 20.0
+    max_players: int = 7
+
+
+class Shoe:
+    """
+    A multi-deck shoe stored as the number of cards left per rank. Drawing
+    picks a rank weighted by those counts, which deals exactly like a
+    shuffled shoe without ever holding the cards.
+    """
+
+    def __init__(self, decks: int = 6, penetration: float = 0.75, rng: random.Random | None = None) -> None:
+        self.decks = decks
+        self.size = decks * 4 * len(RANKS)
+        self.penetration = penetration
+        self.rng = rng or random.Random()
+        self.shuffle()
+
+    def shuffle(self) -> None:
+        self.counts = array.array('H', [self.decks * 4] * len(RANKS))
+        self.remaining = self.size
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self.size - self.remaining >= self.size * self.penetration
+
+    def draw(self) -> str:
+        if not self.remaining:
+            self.shuffle()
+
+        pick = self.rng.randrange(self.remaining)
+        for rank, count in enumerate(self.counts):
+            if pick < count:
+                self.counts[rank] -= 1
+                self.remaining -= 1
+                return RANKS[rank]
+            pick -= count
+        raise AssertionError('Shoe counts out of sync')
+
+
+class Phase(enum.StrEnum):
+    IDLE = 'idle'
+    JOINING = 'joining'
+    ACTING = 'acting'
+
+
+@dataclasses.dataclass
+class Seat:
+    name: str
+    hand: list[str] = dataclasses.field(default_factory=list)
+    done: bool = False
+    # 'hit' or 'stand', sent during the current act round
+    action: str | None = None
+    # Acted at least once this hand, players who don't lose their seat
+    acted: bool = False
+
+    @property
+    def value(self) -> int:
+        return hand_value(self.hand)
+
+    @property
+    def natural(self) -> bool:
+        return len(self.hand) == 2 and self.value == 21
+
+
+class BlackjackTable:
+
+    def __init__(self, shoe: Shoe, join_window: float = 15.0, act_window: float = 20.0, max_players: int = 7) -> None:
+        self.shoe = shoe
+        self.join_window = join_window
+        self.act_window = act_window
+        self.max_players = max_players
+
+        self.phase = Phase.IDLE
+        # Loop time at which the current round closes
+        self.deadline: float | None = None
+        self.seats: dict[str, Seat] = {}
+        # user -> name, dealt in at the next deal
+        self.joining: dict[str, str] = {}
+        self.leaving: set[str] = set()
+        self.dealer: list[str] = []
+        self.hands_dealt = 0
+        self.shuffled = False
+        # Whether the current hand got to an act round, a hand decided at the deal evicts nobody
+        self.had_act_round = False
+
+    @classmethod
+    def from_config(cls, config: TableConfig) -> 'BlackjackTable':
+        return cls(
+            shoe=Shoe(decks=config.decks, penetration=config.penetration),
+            join_window=config.join_window,
+            act_window=config.act_window,
+            max_players=config.max_players,
+        )
+
+    def join(self, user: str, name: str, now: float) -> str | None:
+        """Returns the text to post, if any: the table opening or why the player can't join."""
+        if user in self.seats or user in self.joining:
+            self.leaving.discard(user)
+            return None
+        if len(self.seats) + len(self.joining) >= self.max_players:
+            return f'The table is full ({self.max_players} players).'
+
+        self.joining[user] = name
+        if self.phase is Phase.IDLE:
+            self.phase = Phase.JOINING
+            self.deadline = now + self.join_window
+            return f'{name} opened a blackjack table, dealing in {self.join_window:g}s. "!blackjack join" to sit down.'
+        return None
+
+    def leave(self, user: str, now: float) -> None:
+        self.joining.pop(user, None)
+        if self.phase is Phase.ACTING and user in self.seats:
+            # Give up the hand, the seat goes once it is over
+            self.leaving.add(user)
+            seat = self.seats[user]
+            if not seat.done:
+                seat.action = 'stand'
+            self._close_early_if_all_acted(now)
+        else:
+            self.seats.pop(user, None)
+            if not self.seats and not self.joining:
+                self._close()
+
+    def act(self, user: str, action: str, now: float) -> bool:
+        """
+        Records 'hit' or 'stand' for the current round. Returns False if the
+        player is not at the table, actions out of turn are ignored.
+        """
+        seat = self.seats.get(user)
+        if seat is None:
+            return user in self.joining
+        if self.phase is not Phase.ACTING or seat.done:
+            return True
+
+        seat.action = action
+        seat.acted = True
+        self._close_early_if_all_acted(now)
+        return True
+
+    def _close_early_if_all_acted(self, now: float) -> None:
+        if all(seat.done or seat.action for seat in self.seats.values()):
+            self.deadline = now
+
+    def tick(self, now: float) -> str | None:
+        """Closes the current round once its window is over and returns the post for it."""
+        if self.deadline is None or now < self.deadline:
+            return None
+        if self.phase is Phase.JOINING:
+            return self._deal(now)
+        return self._play_round(now)
+
+    def _close(self) -> None:
+        self.phase = Phase.IDLE
+        self.deadline = None
+
+    def _deal(self, now: float) -> str | None:
+        for user, name in self.joining.items():
+            self.seats[user] = Seat(name)
+        self.joining.clear()
+        if not self.seats:
+            self._close()
+            return None
+
+        self.shuffled = self.shoe.needs_shuffle
+        if self.shuffled:
+            self.shoe.shuffle()
+        self.hands_dealt += 1
+        self.had_act_round = False
+
+        for seat in self.seats.values():
+            seat.hand.clear()
+            seat.done = seat.acted = False
+            seat.action = None
+        self.dealer = []
+        for _ in range(2):
+            for seat in self.seats.values():
+                seat.hand.append(self.shoe.draw())
+            self.dealer.append(self.shoe.draw())
+
+        for seat in self.seats.values():
+            if seat.natural:
+                seat.done = seat.acted = True
+
+        if hand_value(self.dealer) == 21 or all(seat.done for seat in self.seats.values()):
+            return self._finish_hand(now)
+
+        self.phase = Phase.ACTING
+        self.had_act_round = True
+        self.deadline = now + self.act_window
+        return self._render()
+
+    def _play_round(self, now: float) -> str:
+        for seat in self.seats.values():
+            if seat.done:
+                continue
+            if seat.action == 'hit':
+                seat.hand.append(self.shoe.draw())
+                seat.done = seat.value >= 21
+            else:
+                seat.done = True
+            seat.action = None
+
+        if all(seat.done for seat in self.seats.values()):
+            return self._finish_hand(now)
+
+        self.deadline = now + self.act_window
+        return self._render()
+
+    def _finish_hand(self, now: float) -> str:
+        if any(seat.value <= 21 and not seat.natural for seat in self.seats.values()):
+            while hand_value(self.dealer) < 17:
+                self.dealer.append(self.shoe.draw())
+
+        lines = [self._render(finished=True)]
+
+        idle = {user for user, seat in self.seats.items() if self.had_act_round and not seat.acted}
+        for user in self.leaving.intersection(self.seats) | idle:
+            del self.seats[user]
+        self.leaving.clear()
+
+        if self.seats or self.joining:
+            self.phase = Phase.JOINING
+            self.deadline = now + self.join_window
+            lines.append(f'Next hand in {self.join_window:g}s, "!blackjack join" to sit down.')
+        else:
+            self._close()
+            lines.append('The table is closed.')
+        return '\n'.join(lines)
+
+    def _outcome(self, seat: Seat) -> str:
+        dealer_value = hand_value(self.dealer)
+        dealer_natural = len(self.dealer) == 2 and dealer_value == 21
+
+        if seat.value > 21:
+            return 'bust'
+        if seat.natural and not dealer_natural:
+            return 'blackjack, wins'
+        if dealer_natural and not seat.natural:
+            return 'loses'
+        if dealer_value > 21 or seat.value > dealer_value:
+            return 'wins'
+        if seat.value == dealer_value:
+            return 'push'
+        return 'loses'
+
+    def _render(self, finished: bool = False) -> str:
+        header = f'Blackjack hand {self.hands_dealt} ({self.shoe.remaining} cards in the shoe'
+        lines = [header + (', freshly shuffled)' if self.shuffled else ')')]
+
+        if finished:
+            lines.append(f'Dealer: {", ".join(self.dealer)} ({hand_value(self.dealer)})')
+        else:
+            lines.append(f'Dealer: {self.dealer[0]}, ?')
+
+        for seat in self.seats.values():
+            line = f'{seat.name}: {", ".join(seat.hand)} ({seat.value})'
+            if finished:
+                line += f' - {self._outcome(seat)}'
+            elif seat.value > 21:
+                line += ' - bust'
+            elif seat.natural:
+                line += ' - blackjack'
+            elif seat.done:
+                line += ' - stands'
+            lines.append(line)
+
+        if not finished:
+            lines.append(f'Hit or stand within {self.act_window:g}s: "!blackjack hit" / "!blackjack stand"')
+        return '\n'.join(lines)
@@ -1,6 +1,18 @@
+import asyncio
+import logging
+
 import httpx
 from pydantic import BaseModel, HttpUrl, ValidationError
 
+from gamebot.circuit_breaker import CircuitBreaker, RecentCache
+from gamebot.http_clients import HttpClients, default_http_clients
+
+logger = logging.getLogger(__name__)
+
+# Total time a single !cat command may take before a cached image is used
+COMMAND_DEADLINE = 8.0
+API_TIMEOUT = httpx.Timeout(5.0, connect=3.0)
+
 class CatImageResponse(BaseModel):
     id: str
     url: HttpUrl
@@ -10,52 +22,73 @@ class CatImageResponse(BaseModel):
 
 class CatImageFetcher:
 
-    def __init__(self) -> None:
-        self._client = httpx.AsyncClient()
+    def __init__(self, http: HttpClients | None = None) -> None:
+        self._http = http or default_http_clients()
+        self.breaker = CircuitBreaker('thecatapi')
+        self.recent = RecentCache()
     
 
     async def fetch_image_url(self) -> HttpUrl:
         api_url = 'https://api.thecatapi.com/v1/images/search'
         
-        print(f'Fetching cat image URL from {api_url}')
-
-        client = self._client
-
+        logger.debug(f'Fetching cat image URL from {api_url}')
 
         try:
-            response = await client.get(api_url)
+            response = await self._http.get(api_url, timeout=API_TIMEOUT)
             response.raise_for_status()
 
             data = response.json()
             parsed_response = [CatImageResponse.model_validate(entry) for entry in data]
 
             if parsed_response:
-                print(f'Succesfully fetched URL: {parsed_response[0].url}')
+                logger.debug(f'Succesfully fetched URL: {parsed_response[0].url}')
                 return parsed_response[0].url
             else:
                 raise ValueError(f'API response was invalid: {data}')
         except httpx.RequestError as e:
             raise ConnectionError(f"Network or request error while fetching API: {e}") from e
         except ValidationError as e:
-            raise ValidationError(f"API response validation error: {e}") from e
+            raise ValueError(f"API response validation error: {e}") from e
         except Exception as e:
             raise RuntimeError(f"An unexpected error occurred during API URL fetch: {e}") from e
         
     
     async def fetch_image_bytes(self) -> bytes:
         image_url = await self.fetch_image_url()
-        print(f"Loading image bytes from {image_url}...")
-        client = self._client
+        logger.debug(f"Loading image bytes from {image_url}...")
         try:
-            response = await client.get(str(image_url)) # Convert HttpUrl to string for httpx
+            response = await self._http.get(str(image_url), timeout=API_TIMEOUT) # Convert HttpUrl to string for httpx
             response.raise_for_status()
-            print("Image bytes loaded successfully! 🐈")
+            logger.debug("Image bytes loaded successfully! 🐈")
             return response.content # Return raw bytes
 
         except httpx.RequestError as e:
             raise ConnectionError(f"Network or request error while loading image bytes: {e}") from e
         except Exception as e:
             raise RuntimeError(f"An unexpected error occurred during image bytes loading: {e}") from e
+
+
+    async def fetch_image_bytes_or_cached(self, *, deadline: float = COMMAND_DEADLINE) -> tuple[bytes, bool]:
+        """
+        Fetches a fresh image within `deadline` seconds. If the API fails, is
+        too slow or its circuit is open, a recently fetched image is used.
+        Returns the image and whether it came from the cache, raises
+        ConnectionError if there is neither.
+        """
+        try:
+            async with asyncio.timeout(deadline):
+                img = await self.breaker.call(self.fetch_image_bytes)
+        except Exception as e:
+            cached = self.recent.pick(None)
+            if cached is None:
+                raise ConnectionError(f"No cat image available, circuit {self.breaker.state}: {e!r}") from e
+
+            logger.warning(f'Serving cached cat image, fetch failed: {e!r}')
+            self.breaker.counters['cache_hits'] += 1
+            return cached, True
+
+        self.recent.add(None, img)
+        return img, False
         
     
     async def __aenter__(self):
@@ -63,5 +96,4 @@ class CatImageFetcher:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Ensures the httpx client is closed when exiting the context."""
-        await self._client.aclose()
\ No newline at end of file
+        """Nothing to close, the http clients are shared through HttpClients."""
\ No newline at end of file
@@ -5,6 +5,7 @@ import itertools
 import random
 from gamebot.adapters.blhblh import Message, PostMessage
 from gamebot.bots.cat.cat_api import CatImageFetcher
+from gamebot.bots.config import WhitelistConfig
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,9 +24,11 @@ emoji_id = unique_cat_permutations_cycle()
 
 class CatBot():
 
+    config_model = WhitelistConfig
+
     def __init__(
         self, 
-        whitelisted_users: set[str], 
+        whitelisted_users: frozenset[str], 
         subscription: asyncio.Queue,
         topic: asyncio.Queue,    
     ) -> None:
@@ -34,6 +37,17 @@ class CatBot():
         self.subscription = subscription
         self.topic = topic
 
+    @classmethod
+    def from_config(cls, config: WhitelistConfig, subscription: asyncio.Queue, topic: asyncio.Queue) -> 'CatBot':
+        return cls(
+            whitelisted_users=config.whitelisted_users,
+            subscription=subscription,
+            topic=topic,
+        )
+
+    def reconfigure(self, config: WhitelistConfig):
+        self.whitelisted_users = config.whitelisted_users
+
     
     async def work(self):
         
@@ -43,10 +57,10 @@ class CatBot():
 
                 if msg.user in self.whitelisted_users and msg.text == '!cat':
                     logger.info(f'{msg.user} requested a cat. ({msg.text})')
-                    img = await self.cat_api.fetch_image_bytes()                
+                    img, _ = await self.cat_api.fetch_image_bytes_or_cached()
 
-                    post_msg = PostMessage(text='Here is a random cat {}'.format(next(emoji_id)), pic=img)
+                    post_msg = PostMessage(text='Here is a random cat {}'.format(next(emoji_id)), pic=img, source=msg.source)
                     await self.topic.put(post_msg)
             except ConnectionError:
-                post_msg = PostMessage(text='The cat isnt in the mood to be seen', pic=None)
+                post_msg = PostMessage(text='The cat isnt in the mood to be seen', pic=None, source=msg.source)
                 await self.topic.put(post_msg)
@@ -7,11 +7,17 @@ from gamebot.adapters.blhblh import Message, PostMessage
 logger = logging.getLogger(__name__)
 
 class CoinBot():
-    
+
+    config_model = None
+
     def __init__(self, subscription: asyncio.Queue, topic: asyncio.Queue) -> None:
         self.subscription = subscription
         self.topic = topic
 
+    @classmethod
+    def from_config(cls, config: None, subscription: asyncio.Queue, topic: asyncio.Queue) -> 'CoinBot':
+        return cls(subscription=subscription, topic=topic)
+
     async def work(self):
         while True:
             msg: Message = await self.subscription.get()
@@ -29,6 +35,6 @@ class CoinBot():
                 result = 'Omg, it landed on its side 😲'  # 0.0002% chance
 
             logger.info(f'{msg.user} tossed a coin: {result}')
-            post_msg = PostMessage(text=result, pic=None)
+            post_msg = PostMessage(text=result, pic=None, source=msg.source)
             await self.topic.put(post_msg)
             
\ No newline at end of file
@@ -0,0 +1,8 @@
+import pydantic
+
+
+class WhitelistConfig(pydantic.BaseModel):
+    # Immutable, so a reload can hand the same snapshot to a running bot
+    model_config = pydantic.ConfigDict(frozen=True)
+
+    whitelisted_users: frozenset[str]
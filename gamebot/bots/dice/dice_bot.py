@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import random
+
+from gamebot.adapters.blhblh import Message, PostMessage
+from gamebot.bots.dice import dice_engine
+from gamebot.executor import ExecutorService, default_executor
+
+logger = logging.getLogger(__name__)
+
+# Rolls with more dice than this run in the thread pool instead of on the event loop
+OFFLOAD_DICE = 1000
+ROLL_TIMEOUT = 2.0
+
+class DiceBot():
+
+    config_model = None
+
+    def __init__(self, subscription: asyncio.Queue, topic: asyncio.Queue, executor: ExecutorService | None = None) -> None:
+        self.subscription = subscription
+        self.topic = topic
+        self.executor = executor or default_executor()
+
+    @classmethod
+    def from_config(cls, config: None, subscription: asyncio.Queue, topic: asyncio.Queue) -> 'DiceBot':
+        return cls(subscription=subscription, topic=topic)
+
+    async def work(self):
+        await self.executor.run_in_thread(dice_engine.warm_up)
+        while True:
+            msg: Message = await self.subscription.get()
+
+            if msg.text != '!dice' and not msg.text.startswith('!dice '):
+                continue
+
+            expression_text = msg.text.removeprefix('!dice').strip()
+            if not expression_text:
+                roll = random.randint(1, 6)
+                logger.info(f'{msg.user} rolled a dice: {roll}')
+                text = f"Rolling... It's a {roll}"
+            else:
+                try:
+                    result = await self._roll(dice_engine.parse(expression_text))
+                    logger.info(f'{msg.user} rolled {result.expression}: {result.total}')
+                    text = f'{msg.name} rolls {result.expression}: {result.render()}'
+                except dice_engine.DiceError as e:
+                    text = f'{msg.name}: {e}'
+                except TimeoutError:
+                    logger.warning(f"DiceBot: Rolling '{expression_text}' timed out.")
+                    text = f'{msg.name}: That roll took too long, try fewer dice.'
+
+            post_msg = PostMessage(text=text, pic=None, source=msg.source)
+            await self.topic.put(post_msg)
+
+    async def _roll(self, expression: dice_engine.DiceExpression) -> dice_engine.RollResult:
+        if expression.dice_count <= OFFLOAD_DICE:
+            return dice_engine.roll(expression)
+        return await self.executor.run_in_thread(dice_engine.roll, expression, timeout=ROLL_TIMEOUT)
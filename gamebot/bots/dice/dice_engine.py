@@ -0,0 +1,252 @@
+# dice_engine.py
+"""
+Dice expressions like `4d6kh3+2`, `100d20`, `3d6!`, `d%` or `adv+5`.
+
+  NdS     roll N dice with S sides (N defaults to 1, `d%` is d100)
+  khK     keep the highest K dice, klK keeps the lowest K
+  !       exploding: every die that shows its maximum is rolled again and added
+  adv     advantage, same as 2d20kh1 (dis: 2d20kl1)
+  +N, -N  constant modifiers, terms can be chained with + and -
+
+Rolling is vectorized with NumPy, which is imported on the first roll so
+loading the plugin stays cheap. Limits are checked while parsing, so an
+expression that is too big is rejected before anything is rolled.
+"""
+import dataclasses
+import functools
+import re
+
+MAX_EXPRESSION_LENGTH = 100
+MAX_TERMS = 10
+MAX_DICE = 100_000
+MAX_SIDES = 1_000_000
+MAX_CONSTANT = 1_000_000
+MAX_EXPLODE_ROUNDS = 50
+
+# Up to this many dice the single rolls are shown, above that a histogram
+MAX_LISTED_DICE = 20
+HISTOGRAM_BUCKETS = 10
+
+_TERM = re.compile(
+    r'(?P<sign>[+-])?(?:'
+    r'(?P<count>\d+)?d(?P<sides>\d+|%)(?:(?P<keep>k[hl])(?P<keep_n>\d+))?(?P<explode>!)?'
+    r'|(?P<advantage>adv|dis)'
+    r'|(?P<constant>\d+)'
+    r')'
+)
+
+
+class DiceError(ValueError):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class DiceTerm:
+    sign: int
+    count: int
+    sides: int
+    keep: str | None = None  # 'kh' or 'kl'
+    keep_n: int = 0
+    explode: bool = False
+
+    def __str__(self) -> str:
+        text = f'{self.count}d{self.sides}'
+        if self.keep:
+            text += f'{self.keep}{self.keep_n}'
+        if self.explode:
+            text += '!'
+        return text
+
+
+@dataclasses.dataclass(frozen=True)
+class DiceExpression:
+    terms: tuple[DiceTerm, ...]
+    constant: int
+
+    @property
+    def dice_count(self) -> int:
+        return sum(term.count for term in self.terms)
+
+    def __str__(self) -> str:
+        text = ''
+        for term in self.terms:
+            text += f'{"-" if term.sign < 0 else "+"}{term}'
+        if self.constant:
+            text += f'{self.constant:+d}'
+        return text.removeprefix('+') or '0'
+
+
+@dataclasses.dataclass
+class TermResult:
+    term: DiceTerm
+    total: int
+    # The single dice when there are few of them, (kept, dropped)
+    listed: tuple[list[int], list[int]] | None
+    # (label, count) pairs otherwise
+    histogram: list[tuple[str, int]] | None
+
+
+@dataclasses.dataclass
+class RollResult:
+    expression: DiceExpression
+    total: int
+    terms: list[TermResult]
+
+    def render(self) -> str:
+        # Per-term totals are only worth showing next to other terms
+        show_term_totals = len(self.terms) > 1 or bool(self.expression.constant)
+        parts = []
+        for result in self.terms:
+            sign = '-' if result.term.sign < 0 else '+'
+            if result.listed is not None:
+                kept, dropped = result.listed
+                dice = ', '.join([str(value) for value in kept] + [f'({value})' for value in dropped])
+                parts.append(f'{sign} {result.term} [{dice}]')
+            else:
+                histogram = ' '.join(f'{label}:{count}' for label, count in result.histogram)
+                term_total = f' = {result.total}' if show_term_totals else ''
+                parts.append(f'{sign} {result.term}{term_total} {{{histogram}}}')
+        if self.expression.constant or not parts:
+            parts.append(f'{"-" if self.expression.constant < 0 else "+"} {abs(self.expression.constant)}')
+
+        text = ' '.join(parts)
+        # A leading sign sticks to its term: "-3", not "- 3"
+        text = text[2:] if text.startswith('+ ') else '-' + text[2:]
+        return f'{text} = {self.total}'
+
+
+@functools.lru_cache(maxsize=256)
+def parse(text: str) -> DiceExpression:
+    """Parses and validates an expression, cached per expression text."""
+    text = re.sub(r'\s*([+-])\s*', r'\1', text.strip().lower())
+    if not text:
+        raise DiceError('Empty dice expression.')
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise DiceError(f'Dice expression is longer than {MAX_EXPRESSION_LENGTH} characters.')
+
+    terms: list[DiceTerm] = []
+    constant = 0
+    position = 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if match is None or (position > 0 and match['sign'] is None):
+            raise DiceError(f"Can not read dice expression at '{text[position:]}'.")
+        position = match.end()
+        sign = -1 if match['sign'] == '-' else 1
+
+        if match['constant'] is not None:
+            constant += sign * int(match['constant'])
+            continue
+
+        if match['advantage'] is not None:
+            term = DiceTerm(sign=sign, count=2, sides=20, keep='kh' if match['advantage'] == 'adv' else 'kl', keep_n=1)
+        else:
+            sides = 100 if match['sides'] == '%' else int(match['sides'])
+            term = DiceTerm(
+                sign=sign,
+                count=int(match['count']) if match['count'] is not None else 1,
+                sides=sides,
+                keep=match['keep'],
+                keep_n=int(match['keep_n']) if match['keep_n'] is not None else 0,
+                explode=match['explode'] is not None,
+            )
+        _validate(term)
+        terms.append(term)
+
+    expression = DiceExpression(terms=tuple(terms), constant=constant)
+    if len(terms) > MAX_TERMS:
+        raise DiceError(f'At most {MAX_TERMS} dice terms are allowed.')
+    if expression.dice_count > MAX_DICE:
+        raise DiceError(f'At most {MAX_DICE} dice can be rolled at once.')
+    if abs(constant) > MAX_CONSTANT:
+        raise DiceError(f'Modifiers are limited to {MAX_CONSTANT}.')
+
+    return expression
+
+
+def _validate(term: DiceTerm) -> None:
+    if term.count < 1:
+        raise DiceError('Roll at least one die.')
+    if not 1 <= term.sides <= MAX_SIDES:
+        raise DiceError(f'Dice need between 1 and {MAX_SIDES} sides.')
+    if term.keep and not 1 <= term.keep_n <= term.count:
+        raise DiceError(f'Can only keep between 1 and {term.count} dice of {term}.')
+    if term.explode and term.sides < 2:
+        raise DiceError('A die with one side explodes forever.')
+
+
+def warm_up() -> None:
+    """Imports NumPy ahead of the first roll, blocking, so run it off the event loop."""
+    _numpy_rng()
+
+
+def roll(expression: DiceExpression) -> RollResult:
+    results = [_roll_term(term) for term in expression.terms]
+    total = sum(result.term.sign * result.total for result in results) + expression.constant
+    return RollResult(expression=expression, total=total, terms=results)
+
+
+def _roll_term(term: DiceTerm) -> TermResult:
+    values = _roll_values(term.count, term.sides, term.explode)
+
+    if term.count <= MAX_LISTED_DICE:
+        values = [int(value) for value in values]
+        kept = values
+        dropped: list[int] = []
+        if term.keep:
+            order = sorted(range(len(values)), key=values.__getitem__, reverse=term.keep == 'kh')
+            kept_positions = set(order[:term.keep_n])
+            kept = [value for i, value in enumerate(values) if i in kept_positions]
+            dropped = [value for i, value in enumerate(values) if i not in kept_positions]
+        return TermResult(term=term, total=sum(kept), listed=(kept, dropped), histogram=None)
+
+    return TermResult(term=term, total=_kept_sum(values, term), listed=None, histogram=_histogram(values))
+
+
+def _roll_values(count: int, sides: int, explode: bool):
+    import numpy as np
+
+    rng = _numpy_rng()
+    values = rng.integers(1, sides + 1, size=count)
+    if explode:
+        exploding = np.flatnonzero(values == sides)
+        for _ in range(MAX_EXPLODE_ROUNDS):
+            if not exploding.size:
+                break
+            extra = rng.integers(1, sides + 1, size=exploding.size)
+            values[exploding] += extra
+            exploding = exploding[extra == sides]
+    return values
+
+
+def _kept_sum(values, term: DiceTerm) -> int:
+    import numpy as np
+
+    if not term.keep:
+        return int(values.sum())
+    if term.keep == 'kh':
+        return int(np.partition(values, term.count - term.keep_n)[term.count - term.keep_n:].sum())
+    return int(np.partition(values, term.keep_n - 1)[:term.keep_n].sum())
+
+
+def _histogram(values) -> list[tuple[str, int]]:
+    import numpy as np
+
+    low, high = int(values.min()), int(values.max())
+    if high - low < HISTOGRAM_BUCKETS:
+        counts = np.bincount(values - low)
+        return [(str(low + i), int(count)) for i, count in enumerate(counts) if count]
+
+    width = -(-(high - low + 1) // HISTOGRAM_BUCKETS)
+    counts = np.bincount((values - low) // width)
+    return [
+        (f'{low + i * width}-{min(low + (i + 1) * width - 1, high)}', int(count))
+        for i, count in enumerate(counts) if count
+    ]
+
+
+@functools.cache
+def _numpy_rng():
+    import numpy as np
+
+    return np.random.default_rng()
@@ -1,7 +1,23 @@
+import asyncio
+import logging
+
 import httpx
 from pydantic import BaseModel, HttpUrl, ValidationError
 from typing import Optional
 
+from gamebot.circuit_breaker import CircuitBreaker, RecentCache
+from gamebot.http_clients import HttpClients, default_http_clients
+
+logger = logging.getLogger(__name__)
+
+# Total time a single !dog command may take before a cached image is used
+COMMAND_DEADLINE = 8.0
+API_TIMEOUT = httpx.Timeout(5.0, connect=3.0)
+
+
+class UnknownBreedError(ValueError):
+    """The API does not know the requested breed / sub-breed."""
+
 # Pydantic model for the API response
 class DogImageResponse(BaseModel):
     """
@@ -18,22 +34,18 @@ class DogImageFetcher:
     raw bytes from the Dog CEO API.
     """
 
-    def __init__(self):
+    def __init__(self, http: Optional[HttpClients] = None):
         """
         Initializes the DogImageFetcher. The base API URL for random images
         will be constructed dynamically based on method calls.
-        """
-        self._client = None # httpx.AsyncClient will be initialized when first used
 
-    async def _get_client(self):
-        """
-        Internal method to get or create an httpx.AsyncClient instance.
-        This ensures the client is reused across multiple calls within the
-        same class instance, which is more efficient.
+        Args:
+            http (HttpClients, optional): Client registry to use, defaults to the shared one.
         """
-        if self._client is None:
-            self._client = httpx.AsyncClient()
-        return self._client
+        self._http = http or default_http_clients()
+        # Unknown breeds are the user's fault, not the API's
+        self.breaker = CircuitBreaker('dog.ceo', excluded=(UnknownBreedError,))
+        self.recent = RecentCache()
 
     async def fetch_image_url(self, breed: Optional[str] = None, sub_breed: Optional[str] = None) -> HttpUrl:
         """
@@ -50,8 +62,9 @@ class DogImageFetcher:
 
         Raises:
             ValueError: If sub_breed is provided without a breed, or if the API response status is not 'success'.
+            UnknownBreedError: If the API does not know the breed.
             ConnectionError: If there's an issue connecting to the API.
-            ValidationError: If the API response format is invalid according to the Pydantic model.
+            ValueError: If the API response format is invalid according to the Pydantic model.
             RuntimeError: For any other unexpected errors during the fetch.
         """
         if sub_breed and not breed:
@@ -64,25 +77,28 @@ class DogImageFetcher:
         else:
             api_url = "https://dog.ceo/api/breeds/image/random" # Original random endpoint
 
-        client = await self._get_client()
-        print(f"Fetching dog image URL from {api_url}...")
+        logger.debug(f"Fetching dog image URL from {api_url}...")
         try:
-            response = await client.get(api_url)
+            response = await self._http.get(api_url, timeout=API_TIMEOUT)
             response.raise_for_status()  # Raises HTTPStatusError for 4xx/5xx responses
 
             data = response.json()
             parsed_response = DogImageResponse(**data) # Pydantic parsing
 
             if parsed_response.status == "success":
-                print(f"Successfully fetched URL: {parsed_response.message}")
+                logger.debug(f"Successfully fetched URL: {parsed_response.message}")
                 return parsed_response.message
             else:
                 raise ValueError(f"API status was not 'success': {parsed_response.status}")
 
         except httpx.RequestError as e:
             raise ConnectionError(f"Network or request error while fetching API: {e}") from e
+        except httpx.HTTPStatusError as e:
+            if breed and e.response.status_code == 404:
+                raise UnknownBreedError(f"Unknown breed: {' '.join(filter(None, (sub_breed, breed)))}") from e
+            raise RuntimeError(f"API returned an error: {e}") from e
         except ValidationError as e:
-            raise ValidationError(f"API response validation error: {e}") from e
+            raise ValueError(f"API response validation error: {e}") from e
         except Exception as e:
             raise RuntimeError(f"An unexpected error occurred during API URL fetch: {e}") from e
 
@@ -107,12 +123,11 @@ class DogImageFetcher:
         """
         image_url = await self.fetch_image_url(breed=breed, sub_breed=sub_breed) # First get the URL
 
-        client = await self._get_client()
-        print(f"Loading image bytes from {image_url}...")
+        logger.debug(f"Loading image bytes from {image_url}...")
         try:
-            response = await client.get(str(image_url)) # Convert HttpUrl to string for httpx
+            response = await self._http.get(str(image_url), timeout=API_TIMEOUT) # Convert HttpUrl to string for httpx
             response.raise_for_status()
-            print("Image bytes loaded successfully! 🐾")
+            logger.debug("Image bytes loaded successfully! 🐾")
             return response.content # Return raw bytes
 
         except httpx.RequestError as e:
@@ -120,11 +135,42 @@ class DogImageFetcher:
         except Exception as e:
             raise RuntimeError(f"An unexpected error occurred during image bytes loading: {e}") from e
 
+    async def fetch_image_bytes_or_cached(
+        self, breed: Optional[str] = None, sub_breed: Optional[str] = None, *, deadline: float = COMMAND_DEADLINE,
+    ) -> tuple[bytes, bool]:
+        """
+        Like `fetch_image_bytes`, but bounded by `deadline` seconds in total and
+        guarded by the circuit breaker. If the API fails, is too slow or its
+        circuit is open, a recently fetched image of the same breed is used.
+
+        Returns:
+            tuple[bytes, bool]: The image and whether it came from the cache.
+
+        Raises:
+            UnknownBreedError: If the API does not know the breed.
+            ConnectionError: If neither a fresh nor a cached image is available.
+        """
+        key = (breed, sub_breed)
+        try:
+            async with asyncio.timeout(deadline):
+                img = await self.breaker.call(self.fetch_image_bytes, breed=breed, sub_breed=sub_breed)
+        except UnknownBreedError:
+            raise
+        except Exception as e:
+            cached = self.recent.pick(key)
+            if cached is None:
+                raise ConnectionError(f"No dog image available, circuit {self.breaker.state}: {e!r}") from e
+
+            logger.warning(f'Serving cached dog image, fetch failed: {e!r}')
+            self.breaker.counters['cache_hits'] += 1
+            return cached, True
+
+        self.recent.add(key, img)
+        return img, False
+
     async def __aenter__(self):
         """Allows the class to be used as an async context manager."""
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Ensures the httpx client is closed when exiting the context."""
-        if self._client:
-            await self._client.aclose()
\ No newline at end of file
+        """Nothing to close, the http clients are shared through HttpClients."""
\ No newline at end of file
@@ -3,7 +3,8 @@
 import asyncio
 import itertools
 from gamebot.adapters.blhblh import Message, PostMessage
-from gamebot.bots.dog.dog_api import DogImageFetcher
+from gamebot.bots.config import WhitelistConfig
+from gamebot.bots.dog.dog_api import DogImageFetcher, UnknownBreedError
 import logging
 import random
 
@@ -22,9 +23,11 @@ emoji_id = unique_dog_permutations_cycle()
 
 class DogBot():
 
+    config_model = WhitelistConfig
+
     def __init__(
             self, 
-            whitelisted_users: set[str], 
+            whitelisted_users: frozenset[str], 
             subscription: asyncio.Queue,
             topic: asyncio.Queue,    
         ) -> None:
@@ -33,6 +36,17 @@ class DogBot():
         self.subscription = subscription
         self.topic = topic
 
+    @classmethod
+    def from_config(cls, config: WhitelistConfig, subscription: asyncio.Queue, topic: asyncio.Queue) -> 'DogBot':
+        return cls(
+            whitelisted_users=config.whitelisted_users,
+            subscription=subscription,
+            topic=topic,
+        )
+
+    def reconfigure(self, config: WhitelistConfig):
+        self.whitelisted_users = config.whitelisted_users
+
     
     async def work(self):
         
@@ -44,18 +58,25 @@ class DogBot():
 
 
                     if msg.text == '!dog':
-                        img = await self.dog_api.fetch_image_bytes()
+                        img, _ = await self.dog_api.fetch_image_bytes_or_cached()
                         dog = 'dog'
                     else:
                         parts = msg.text.lower().removeprefix('!dog').strip().split()
+                        if len(parts) > 2:
+                            post_msg = PostMessage(text='Use "!dog", "!dog <breed>" or "!dog <sub-breed> <breed>"', pic=None, source=msg.source)
+                            await self.topic.put(post_msg)
+                            continue
 
-                        img = await self.dog_api.fetch_image_bytes(*reversed(parts))
+                        img, _ = await self.dog_api.fetch_image_bytes_or_cached(*reversed(parts))
                         dog = ' '.join(parts)
 
-                    post_msg = PostMessage(text='Here is a random {} {}'.format(dog, next(emoji_id)), pic=img)
+                    post_msg = PostMessage(text='Here is a random {} {}'.format(dog, next(emoji_id)), pic=img, source=msg.source)
                     await self.topic.put(post_msg)
+            except UnknownBreedError:
+                post_msg = PostMessage(text="Sorry, I don't know that breed", pic=None, source=msg.source)
+                await self.topic.put(post_msg)
             except ConnectionError:
-                post_msg = PostMessage(text='Sorry, the dogs are currently out on a walk', pic=None)
+                post_msg = PostMessage(text='Sorry, the dogs are currently out on a walk', pic=None, source=msg.source)
                 await self.topic.put(post_msg)
 
     
\ No newline at end of file
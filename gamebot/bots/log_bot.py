@@ -4,13 +4,19 @@ import logging
 logger = logging.getLogger(__name__)
 
 class LogBot():
-    
+
+    config_model = None
+
     def __init__(self, subscription: asyncio.Queue) -> None:
         self.subscription = subscription
 
+    @classmethod
+    def from_config(cls, config: None, subscription: asyncio.Queue, topic: asyncio.Queue) -> 'LogBot':
+        return cls(subscription=subscription)
+
     
     async def work(self):
         while True:
             msg = await self.subscription.get()
-            logger.info(f"{msg.user} said {msg.text}")
+            logger.info(f"[{msg.source}] {msg.user} said {msg.text}")
             
\ No newline at end of file
@@ -0,0 +1,122 @@
+# registry.py
+import asyncio
+import dataclasses
+import importlib
+import importlib.metadata
+import logging
+import time
+from typing import Any
+
+import pydantic
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'gamebot.bots'
+
+# Built-in bots, referenced by 'module:attribute' so nothing is imported
+# until a bot is actually enabled in the config.
+BUILTIN_PLUGINS: dict[str, str] = {
+    'log_bot': 'gamebot.bots.log_bot:LogBot',
+    'dog_bot': 'gamebot.bots.dog.dog_bot:DogBot',
+    'cat_bot': 'gamebot.bots.cat.cat_bot:CatBot',
+    'blackjack_bot': 'gamebot.bots.blackjack.blackjack_bot:BlackjackBot',
+    'coin_bot': 'gamebot.bots.coin_bot:CoinBot',
+    'dice_bot': 'gamebot.bots.dice.dice_bot:DiceBot',
+    'stats_bot': 'gamebot.bots.stats.stats_bot:StatsBot',
+}
+
+# Run when the config has no `plugins` list. Newer bots stay opt-in, so a
+# deployment relying on the default does not gain commands on upgrade.
+DEFAULT_PLUGINS: list[str] = ['log_bot', 'dog_bot', 'cat_bot', 'blackjack_bot', 'coin_bot', 'dice_bot']
+
+
+class PluginError(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class BotPlugin:
+    """
+    A bot that can be enabled from the config.
+
+    The bot class is only imported on first call to `load()`. A bot class
+    declares its config section with a `config_model` class attribute
+    (None if it takes no config) and is built through `from_config`. Bots
+    that can take a new config while running implement `reconfigure(config)`.
+    """
+    name: str
+    target: str
+    import_time: float | None = None
+    _bot_cls: type | None = dataclasses.field(default=None, repr=False)
+
+    def load(self) -> type:
+        if self._bot_cls is None:
+            module_name, _, attr = self.target.partition(':')
+            if not attr:
+                raise PluginError(f"Plugin '{self.name}' target must be 'module:Class', got '{self.target}'")
+
+            start = time.perf_counter()
+            try:
+                module = importlib.import_module(module_name)
+                self._bot_cls = getattr(module, attr)
+            except (ImportError, AttributeError) as e:
+                raise PluginError(f"Can not load plugin '{self.name}' from '{self.target}': {e}") from e
+            self.import_time = time.perf_counter() - start
+            logger.info(f"Loaded plugin '{self.name}' in {self.import_time * 1000:.1f}ms")
+
+        return self._bot_cls
+
+    def parse_config(self, raw: Any) -> pydantic.BaseModel | None:
+        config_model: type[pydantic.BaseModel] | None = getattr(self.load(), 'config_model', None)
+        if config_model is None:
+            return None
+        return config_model.model_validate(raw if raw is not None else {})
+
+    def build(self, config: pydantic.BaseModel | None, subscription: asyncio.Queue, topic: asyncio.Queue) -> Any:
+        return self.load().from_config(config, subscription=subscription, topic=SenderTopic(topic, self.name))
+
+
+class SenderTopic:
+    """
+    The topic a bot puts its replies on. Stamps every reply with the plugin
+    name, so the outbound queue can share the room fairly between bots.
+    """
+
+    def __init__(self, topic: asyncio.Queue, sender: str) -> None:
+        self.topic = topic
+        self.sender = sender
+
+    async def put(self, post_msg: Any):
+        if not post_msg.sender:
+            post_msg.sender = self.sender
+        await self.topic.put(post_msg)
+
+
+def discover_plugins() -> dict[str, BotPlugin]:
+    """
+    Returns all known plugins: the built-in ones plus anything registered
+    under the 'gamebot.bots' entry point group. Nothing is imported here.
+    """
+    targets = dict(BUILTIN_PLUGINS)
+    for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+        targets[entry_point.name] = entry_point.value
+
+    return {name: BotPlugin(name=name, target=target) for name, target in targets.items()}
+
+
+def resolve_plugins(enabled: list[str], known: dict[str, BotPlugin] | None = None) -> list[BotPlugin]:
+    """
+    Maps the `plugins` list from the config onto plugin objects.
+    Entries are either a registered name or a 'module:Class' path.
+    """
+    known = discover_plugins() if known is None else known
+    resolved = []
+    for entry in enabled:
+        if entry in known:
+            resolved.append(known[entry])
+        elif ':' in entry:
+            resolved.append(BotPlugin(name=entry, target=entry))
+        else:
+            raise PluginError(f"Unknown plugin '{entry}'. Known plugins: {', '.join(sorted(known))}")
+
+    return resolved
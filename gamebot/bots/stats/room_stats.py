@@ -0,0 +1,147 @@
+# room_stats.py
+"""
+Bounded, incremental activity aggregates for one room. Adding a message is
+O(1) (amortized for the sketches), memory depends only on the window and
+sketch sizes, never on how many users or messages a room has seen.
+
+  RingCounter       message counts in a ring of time buckets
+  HeavyHitters      Misra-Gries sketch of the most frequent keys
+  RingHeavyHitters  one HeavyHitters per time bucket, merged when queried
+
+Buckets are keyed by message time, so old buckets are simply overwritten
+once the window has moved past them.
+"""
+import collections
+from typing import Any, Callable
+
+from cachetools import LRUCache
+
+HOUR = 3600
+
+
+class TimeBuckets:
+    """A ring of `buckets` values, each covering `bucket_seconds` of time."""
+
+    def __init__(self, buckets: int, bucket_seconds: float, factory: Callable[[], Any]) -> None:
+        self.buckets = buckets
+        self.bucket_seconds = bucket_seconds
+        self._factory = factory
+        self._ids = [-1] * buckets
+        self._values = [factory() for _ in range(buckets)]
+        self._newest = -1
+
+    def slot(self, ts: float) -> int | None:
+        """Slot of the bucket for `ts`, reset if it held an older bucket. None if `ts` is before the window."""
+        bucket_id = int(ts // self.bucket_seconds)
+        if bucket_id <= self._newest - self.buckets:
+            return None
+        self._newest = max(self._newest, bucket_id)
+
+        slot = bucket_id % self.buckets
+        if self._ids[slot] != bucket_id:
+            self._ids[slot] = bucket_id
+            self._values[slot] = self._factory()
+        return slot
+
+    def window(self, now: float) -> list[tuple[float, Any]]:
+        """(bucket start, value or None) for every bucket of the window ending at `now`, oldest first."""
+        current = int(now // self.bucket_seconds)
+        result = []
+        for bucket_id in range(current - self.buckets + 1, current + 1):
+            slot = bucket_id % self.buckets
+            value = self._values[slot] if self._ids[slot] == bucket_id else None
+            result.append((bucket_id * self.bucket_seconds, value))
+        return result
+
+
+class RingCounter(TimeBuckets):
+
+    def __init__(self, buckets: int, bucket_seconds: float) -> None:
+        super().__init__(buckets, bucket_seconds, int)
+
+    def add(self, ts: float) -> None:
+        slot = self.slot(ts)
+        if slot is not None:
+            self._values[slot] += 1
+
+    def series(self, now: float) -> list[tuple[float, int]]:
+        return [(start, count or 0) for start, count in self.window(now)]
+
+    def total(self, now: float, buckets: int | None = None) -> int:
+        """Sum over the window, or over its last `buckets` buckets."""
+        series = self.series(now)
+        return sum(count for _, count in series[-(buckets or self.buckets):])
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary with at most `capacity` counters. Counts are
+    underestimated by at most total / (capacity + 1), so every key above
+    that share of the stream is guaranteed to be in the summary.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.total = 0
+
+    def add(self, key: str) -> None:
+        self.total += 1
+        counts = self.counts
+        if key in counts:
+            counts[key] += 1
+        elif len(counts) < self.capacity:
+            counts[key] = 1
+        else:
+            # Every decrement cancels out an earlier increment, so this is amortized O(1)
+            for other in list(counts):
+                if counts[other] == 1:
+                    del counts[other]
+                else:
+                    counts[other] -= 1
+
+
+class RingHeavyHitters(TimeBuckets):
+
+    def __init__(self, buckets: int, bucket_seconds: float, capacity: int) -> None:
+        super().__init__(buckets, bucket_seconds, lambda: HeavyHitters(capacity))
+
+    def add(self, ts: float, key: str) -> None:
+        slot = self.slot(ts)
+        if slot is not None:
+            self._values[slot].add(key)
+
+    def top(self, now: float, n: int) -> list[tuple[str, int]]:
+        merged = collections.Counter()
+        for _, sketch in self.window(now):
+            if sketch is not None:
+                merged.update(sketch.counts)
+        return merged.most_common(n)
+
+
+class RoomStats:
+    """Sliding window stats of one room: messages per hour, per user and per bot."""
+
+    def __init__(self, window_hours: int = 24, capacity: int = 64, command_bots: dict[str, str] | None = None) -> None:
+        self.messages = RingCounter(window_hours, HOUR)
+        self.users = RingHeavyHitters(window_hours, HOUR, capacity)
+        self.bots = RingHeavyHitters(window_hours, HOUR, capacity)
+        self.command_bots = command_bots or {}
+        # Display names of recently active users
+        self.names: LRUCache[str, str] = LRUCache(maxsize=capacity * 4)
+
+    def add(self, ts: float, user: str, name: str, text: str) -> None:
+        self.messages.add(ts)
+        self.users.add(ts, user)
+        self.names[user] = name
+
+        if text.startswith('!'):
+            command = text.split(maxsplit=1)[0].lower()
+            self.bots.add(ts, self.command_bots.get(command, command[:32]))
+
+    def top_users(self, now: float, n: int) -> list[tuple[str, int]]:
+        return [(self.names.get(user, user), count) for user, count in self.users.top(now, n)]
+
+    def busiest_hour(self, now: float) -> tuple[float, int] | None:
+        start, count = max(self.messages.series(now), key=lambda bucket: bucket[1])
+        return (start, count) if count else None
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+import logging
+import time
+
+import pydantic
+
+from gamebot.adapters.blhblh import Message, PostMessage
+from gamebot.bots.stats.room_stats import RoomStats
+
+logger = logging.getLogger(__name__)
+
+# Commands of the built-in bots, usage of anything else is counted per command
+COMMAND_BOTS = {
+    '!dog': 'dog_bot',
+    '!cat': 'cat_bot',
+    '!blackjack': 'blackjack_bot',
+    '!coin': 'coin_bot',
+    '!dice': 'dice_bot',
+    '!top': 'stats_bot',
+    '!stats': 'stats_bot',
+}
+
+
+class StatsConfig(pydantic.BaseModel):
+    window_hours: int = pydantic.Field(24, ge=1, le=24 * 7)
+    # Counters per sketch, users or commands rarer than 1/capacity of the traffic may be missed
+    capacity: int = pydantic.Field(64, ge=8)
+    top_n: int = 5
+
+
+class StatsBot():
+
+    config_model = StatsConfig
+
+    def __init__(self, subscription: asyncio.Queue, topic: asyncio.Queue, config: StatsConfig | None = None) -> None:
+        self.subscription = subscription
+        self.topic = topic
+        self.config = config or StatsConfig()
+        # One set of stats per adapter
+        self.rooms: dict[str, RoomStats] = {}
+
+    @classmethod
+    def from_config(cls, config: StatsConfig, subscription: asyncio.Queue, topic: asyncio.Queue) -> 'StatsBot':
+        return cls(subscription=subscription, topic=topic, config=config)
+
+    def _room(self, source: str) -> RoomStats:
+        room = self.rooms.get(source)
+        if room is None:
+            room = self.rooms[source] = RoomStats(self.config.window_hours, self.config.capacity, COMMAND_BOTS)
+        return room
+
+    async def work(self):
+        while True:
+            msg: Message = await self.subscription.get()
+
+            room = self._room(msg.source)
+            room.add(msg.time.timestamp(), msg.user, msg.name, msg.text)
+
+            match msg.text.strip().lower():
+                case '!top':
+                    text = self.top_text(room, time.time())
+                case '!stats':
+                    text = self.stats_text(room, time.time())
+                case _:
+                    continue
+
+            post_msg = PostMessage(text=text, pic=None, source=msg.source)
+            await self.topic.put(post_msg)
+
+    def top_text(self, room: RoomStats, now: float) -> str:
+        top = room.top_users(now, self.config.top_n)
+        if not top:
+            return f'No messages in the last {self.config.window_hours}h yet.'
+        ranking = ', '.join(f'{name} {count}' for name, count in top)
+        return f'Most active in the last {self.config.window_hours}h: {ranking}'
+
+    def stats_text(self, room: RoomStats, now: float) -> str:
+        hours = self.config.window_hours
+        lines = [f'Last hour: {room.messages.total(now, 1)} messages, last {hours}h: {room.messages.total(now)} messages']
+
+        busiest = room.busiest_hour(now)
+        if busiest is not None:
+            start, count = busiest
+            hour = datetime.datetime.fromtimestamp(start, datetime.timezone.utc)
+            lines.append(f'Busiest hour: {hour:%a %H:00} UTC ({count} messages)')
+
+        usage = room.bots.top(now, self.config.top_n)
+        if usage:
+            lines.append('Bot usage: ' + ', '.join(f'{bot} {count}' for bot, count in usage))
+        return '\n'.join(lines)
@@ -0,0 +1,236 @@
+# bus.py
+"""
+Local message bus between the adapter process and out-of-process bot
+workers, over a Unix domain socket.
+
+Frames are a 4 byte big-endian length followed by a msgpack packed dict.
+
+Flow control is credit based: a worker announces how many messages it can
+hold (`hello`), every message sent uses up one credit and the worker hands
+credits back (`credit`) as its bot takes messages off its queue. While a
+worker is down or out of credits, messages stay buffered in its
+subscription queue on the adapter side.
+
+Messages sent to a worker stay in flight on the server until the worker
+reports them taken. A (re)connecting worker says how many it took since its
+last credit frame and how many it still holds; the rest was lost with the
+old connection or process and is sent again first. Delivery is at least
+once: a message taken just before a worker crashed may be seen twice.
+"""
+import asyncio
+import collections
+import logging
+import os
+import struct
+from typing import Any, Callable
+
+import msgpack
+
+from gamebot.adapters.blhblh import Message, PostMessage
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('>I')
+MAX_FRAME_BYTES = 32 * 1024 * 1024
+
+
+def pack(obj: dict[str, Any]) -> bytes:
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def unpack(data: bytes) -> dict[str, Any]:
+    return msgpack.unpackb(data, raw=False)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict[str, Any]:
+    (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f'Frame of {size} bytes exceeds the {MAX_FRAME_BYTES} byte limit.')
+    return unpack(await reader.readexactly(size))
+
+
+def write_frame(writer: asyncio.StreamWriter, frame: dict[str, Any]) -> None:
+    payload = pack(frame)
+    writer.write(HEADER.pack(len(payload)) + payload)
+
+
+class BusServer:
+    """
+    Runs next to the adapter(s). Serves one subscription per worker name
+    and puts the workers' replies on the adapter topic.
+    """
+
+    def __init__(self, adapter: Any, path: str, worker_names: list[str]) -> None:
+        self.adapter = adapter
+        self.path = path
+        # Subscribe up front so messages are buffered before a worker connects.
+        self.subscriptions: dict[str, asyncio.Queue] = {
+            name: adapter.subscribe(name) for name in worker_names
+        }
+        self.connections: dict[str, asyncio.Task] = {}
+        # Sent to the worker and not reported taken yet, oldest first
+        self.in_flight: dict[str, collections.deque[Message]] = {name: collections.deque() for name in worker_names}
+        # Lost by a worker, sent again before anything new
+        self.resend: dict[str, collections.deque[Message]] = {name: collections.deque() for name in worker_names}
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        logger.info(f'BusServer: Listening on {self.path}')
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        name = None
+        try:
+            hello = await read_frame(reader)
+            name = hello.get('name')
+            if hello.get('t') != 'hello' or name not in self.subscriptions:
+                logger.error(f'BusServer: Rejecting worker with hello {hello}')
+                return
+
+            previous = self.connections.pop(name, None)
+            if previous is not None:
+                # Wait for the old connection and its sender to stop, so in_flight is settled before recovering
+                previous.cancel()
+                await asyncio.gather(previous, return_exceptions=True)
+            self.connections[name] = asyncio.current_task()
+
+            self._recover(name, hello.get('consumed', 0), hello.get('held', 0))
+            logger.info(f"BusServer: Worker '{name}' connected with {hello['credits']} credits")
+            credits = asyncio.Semaphore(hello['credits'])
+            sender = asyncio.create_task(self._send(name, writer, credits))
+            try:
+                while True:
+                    frame = await read_frame(reader)
+                    match frame['t']:
+                        case 'credit':
+                            in_flight = self.in_flight[name]
+                            for _ in range(frame['n']):
+                                credits.release()
+                                if in_flight:
+                                    in_flight.popleft()
+                        case 'reply':
+                            await self.adapter.topic.put(PostMessage.model_validate(frame['msg']))
+                        case other:
+                            logger.warning(f"BusServer: Unknown frame type '{other}' from '{name}'")
+            finally:
+                sender.cancel()
+                await asyncio.gather(sender, return_exceptions=True)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.info(f"BusServer: Worker '{name}' disconnected")
+        except Exception as e:
+            logger.error(f"BusServer: Error on connection of worker '{name}': {e}", exc_info=True)
+        finally:
+            if name is not None and self.connections.get(name) is asyncio.current_task():
+                self.connections.pop(name)
+            writer.close()
+
+    def _recover(self, name: str, consumed: int, held: int) -> None:
+        """
+        Reconciles the messages in flight with a connecting worker: the first
+        `consumed` were taken by its bot, the next `held` are still in its
+        queue, anything after that never made it and is queued for resending.
+        """
+        in_flight = self.in_flight[name]
+        for _ in range(min(consumed, len(in_flight))):
+            in_flight.popleft()
+
+        lost = []
+        while len(in_flight) > held:
+            lost.append(in_flight.pop())
+        if lost:
+            # `lost` is newest first, extendleft puts the oldest in front
+            self.resend[name].extendleft(lost)
+            logger.warning(f"BusServer: Resending {len(lost)} message(s) lost by worker '{name}'")
+
+    async def _send(self, name: str, writer: asyncio.StreamWriter, credits: asyncio.Semaphore):
+        subscription = self.subscriptions[name]
+        resend = self.resend[name]
+        while True:
+            await credits.acquire()
+            msg: Message = resend.popleft() if resend else await subscription.get()
+            # Tracked before writing, so a failed write is recovered on reconnect
+            self.in_flight[name].append(msg)
+            write_frame(writer, {'t': 'msg', 'msg': msg.model_dump(mode='json')})
+            await writer.drain()
+
+
+class CreditQueue(asyncio.Queue):
+    """asyncio.Queue that reports every item taken off it."""
+
+    def __init__(self, maxsize: int, on_get: Callable[[], None]) -> None:
+        super().__init__(maxsize=maxsize)
+        self.on_get = on_get
+
+    def get_nowait(self):
+        item = super().get_nowait()
+        self.on_get()
+        return item
+
+
+class BusWorker:
+    """
+    Runs one bot in its own process, fed from a `BusServer`. Reconnects when
+    the adapter process goes away; the bot keeps its state meanwhile.
+    """
+
+    def __init__(self, name: str, path: str, credits: int = 32) -> None:
+        self.name = name
+        self.path = path
+        self.credits = credits
+        self._returned = 0
+        self._writer: asyncio.StreamWriter | None = None
+        self.subscription = CreditQueue(maxsize=credits, on_get=self._return_credit)
+        self.topic = asyncio.Queue()
+
+    def _return_credit(self):
+        # Hand credits back in batches to keep the frame count down.
+        self._returned += 1
+        if self._writer is not None and self._returned >= max(self.credits // 4, 1):
+            write_frame(self._writer, {'t': 'credit', 'n': self._returned})
+            self._returned = 0
+
+    async def _forward_replies(self):
+        while True:
+            post_msg: PostMessage = await self.topic.get()
+            while self._writer is None:
+                await asyncio.sleep(0.1)
+            write_frame(self._writer, {'t': 'reply', 'msg': post_msg.model_dump()})
+            await self._writer.drain()
+
+    async def run(self):
+        replies = asyncio.create_task(self._forward_replies())
+        try:
+            while True:
+                try:
+                    await self._connect_and_receive()
+                except (asyncio.IncompleteReadError, ConnectionError, FileNotFoundError) as e:
+                    logger.info(f"BusWorker '{self.name}': Connection lost ({e}), reconnecting...")
+                finally:
+                    self._writer = None
+                await asyncio.sleep(1)
+        finally:
+            replies.cancel()
+
+    async def _connect_and_receive(self):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        # Anything still queued locally keeps its credit used up.
+        held = self.subscription.qsize()
+        hello = {'t': 'hello', 'name': self.name, 'credits': self.credits - held, 'consumed': self._returned, 'held': held}
+        self._returned = 0
+        write_frame(writer, hello)
+        await writer.drain()
+        self._writer = writer
+        logger.info(f"BusWorker '{self.name}': Connected to {self.path}")
+
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame['t'] == 'msg':
+                    self.subscription.put_nowait(Message.model_validate(frame['msg']))
+        finally:
+            writer.close()
@@ -0,0 +1,132 @@
+# circuit_breaker.py
+import collections
+import enum
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from gamebot import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class CircuitState(enum.StrEnum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+
+    Closed: calls go through. A call counts as failed when it raises or takes
+    longer than `slow_call_seconds`; `failure_threshold` failures within the
+    last `window` calls open the circuit.
+    Open: calls fail fast with CircuitOpenError for `reset_timeout` seconds.
+    Half open: a single trial call decides between closed and open again.
+
+    Exceptions in `excluded` (e.g. bad user input) count as successes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        window: int = 10,
+        slow_call_seconds: float = 3.0,
+        reset_timeout: float = 30.0,
+        excluded: tuple[type[BaseException], ...] = (),
+    ) -> None:
+        self.name = name
+        self.excluded = excluded
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self._outcomes: collections.deque[bool] = collections.deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.counters = collections.Counter()
+        metrics.register(f'circuit.{name}', self.metrics)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state != self.state:
+            logger.warning(f"CircuitBreaker '{self.name}': {self.state} -> {state}")
+            self.state = state
+            self.counters[f'to_{state}'] += 1
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def allow(self) -> bool:
+        if self.state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+
+        match self.state:
+            case CircuitState.CLOSED:
+                return True
+            case CircuitState.HALF_OPEN if not self._trial_running:
+                self._trial_running = True
+                return True
+            case _:
+                return False
+
+    def record(self, success: bool) -> None:
+        self.counters['success' if success else 'failure'] += 1
+
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_running = False
+            self._transition(CircuitState.CLOSED if success else CircuitState.OPEN)
+            return
+
+        self._outcomes.append(success)
+        if self._outcomes.count(False) >= self.failure_threshold:
+            self._transition(CircuitState.OPEN)
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        if not self.allow():
+            self.counters['rejected'] += 1
+            raise CircuitOpenError(f"Circuit '{self.name}' is open.")
+
+        start = time.monotonic()
+        try:
+            result = await fn(*args, **kwargs)
+        except self.excluded:
+            self.record(True)
+            raise
+        except BaseException:
+            # Includes cancellation by a caller's deadline, which is exactly
+            # the slow upstream case.
+            self.record(False)
+            raise
+
+        slow = time.monotonic() - start > self.slow_call_seconds
+        if slow:
+            self.counters['slow'] += 1
+        self.record(not slow)
+        return result
+
+    def metrics(self) -> dict[str, Any]:
+        return {'state': str(self.state), **self.counters}
+
+
+class RecentCache:
+    """Keeps the last few results per key to serve while an upstream is down."""
+
+    def __init__(self, maxlen: int = 8) -> None:
+        self._items: collections.deque[tuple[Hashable, Any]] = collections.deque(maxlen=maxlen)
+
+    def add(self, key: Hashable, value: Any) -> None:
+        self._items.append((key, value))
+
+    def pick(self, key: Hashable) -> Any | None:
+        matches = [value for item_key, value in self._items if item_key == key]
+        return random.choice(matches) if matches else None
@@ -0,0 +1,69 @@
+# config_watcher.py
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Generic, TypeVar
+
+from gamebot.executor import ExecutorService, default_executor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class ConfigWatcher(Generic[T]):
+    """
+    Polls a config file and reloads it when it changed. Both the stat and
+    the parsing run in the thread pool, so the event loop never touches the
+    file.
+
+    `load(path)` returns the parsed config or None if it is invalid, in
+    which case the current config stays. `apply(current, new)` swaps the
+    new config in and returns False if it was rejected.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        current: T,
+        load: Callable[[Path], T | None],
+        apply: Callable[[T, T], bool],
+        interval: float = 2.0,
+        executor: ExecutorService | None = None,
+    ) -> None:
+        self.path = path
+        self.current = current
+        self.load = load
+        self.apply = apply
+        self.interval = interval
+        self.executor = executor or default_executor()
+        self.reloads = 0
+
+    def _stamp(self) -> tuple[int, int, int] | None:
+        # Follows symlinks, so a swapped ConfigMap link shows up as a new inode
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    async def run(self):
+        stamp = await self.executor.run_in_thread(self._stamp)
+        while True:
+            await asyncio.sleep(self.interval)
+            new_stamp = await self.executor.run_in_thread(self._stamp)
+            if new_stamp == stamp or new_stamp is None:
+                # Unchanged, or in the middle of being replaced
+                continue
+            stamp = new_stamp
+
+            config = await self.executor.run_in_thread(self.load, self.path)
+            if config is None:
+                logger.error(f'ConfigWatcher: {self.path} changed but is invalid, keeping the current config.')
+                continue
+
+            if self.apply(self.current, config):
+                self.current = config
+                self.reloads += 1
+                logger.info(f'ConfigWatcher: Reloaded {self.path}.')
@@ -0,0 +1,158 @@
+# executor.py
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a job's deadline passed before it ran or finished."""
+
+
+def _check_deadline(deadline: float | None) -> None:
+    if deadline is not None and time.time() >= deadline:
+        raise DeadlineExceeded('Job deadline passed before it started.')
+
+
+def _run_job(fn: Callable[..., T], args: tuple, deadline: float | None) -> T:
+    # Runs inside the worker: skip work that sat in the queue for too long.
+    _check_deadline(deadline)
+    return fn(*args)
+
+
+def _run_job_shm(fn: Callable[..., T], shm_name: str, size: int, args: tuple, deadline: float | None) -> T:
+    _check_deadline(deadline)
+    shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    view = shm.buf[:size]
+    try:
+        return fn(view, *args)
+    finally:
+        view.release()
+        shm.close()
+
+
+def _release_shm(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+class ExecutorService:
+    """
+    Shared thread and process pools for CPU heavy or blocking work, so it
+    does not stall the event loop (and with it every bot and the Socket.IO
+    heartbeat).
+
+    Deadlines are absolute `time.time()` values. Work whose deadline has
+    passed is never started; `timeout` bounds how long the caller waits.
+    Whichever limit is hit first is reported: `DeadlineExceeded` for the
+    deadline, a plain `TimeoutError` for the timeout.
+    """
+
+    def __init__(self, max_threads: int | None = None, max_processes: int | None = None) -> None:
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self._thread_pool: concurrent.futures.ThreadPoolExecutor | None = None
+        self._process_pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+    @property
+    def thread_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_threads,
+                thread_name_prefix='gamebot-worker',
+            )
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_processes,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._process_pool
+
+    async def _await(self, future: concurrent.futures.Future, timeout: float | None, deadline: float | None) -> Any:
+        by_deadline = False
+        if deadline is not None:
+            remaining = deadline - time.time()
+            by_deadline = timeout is None or remaining <= timeout
+            if by_deadline:
+                timeout = remaining
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except DeadlineExceeded:
+            raise
+        except TimeoutError:
+            # Drops the job if it has not been picked up by a worker yet.
+            future.cancel()
+            if by_deadline:
+                raise DeadlineExceeded('Job deadline passed before it finished.') from None
+            raise
+
+    async def run_in_thread(
+        self, fn: Callable[..., T], *args: Any, timeout: float | None = None, deadline: float | None = None,
+    ) -> T:
+        _check_deadline(deadline)
+        future = self.thread_pool.submit(_run_job, fn, args, deadline)
+        return await self._await(future, timeout, deadline)
+
+    async def run_in_process(
+        self, fn: Callable[..., T], *args: Any, timeout: float | None = None, deadline: float | None = None,
+    ) -> T:
+        """
+        `fn` and `args` must be picklable. For large byte payloads use
+        `run_in_process_shm` instead.
+        """
+        _check_deadline(deadline)
+        future = self.process_pool.submit(_run_job, fn, args, deadline)
+        return await self._await(future, timeout, deadline)
+
+    async def run_in_process_shm(
+        self, fn: Callable[..., T], data: bytes, *args: Any, timeout: float | None = None, deadline: float | None = None,
+    ) -> T:
+        """
+        Like `run_in_process`, but hands `data` to the worker through shared
+        memory instead of pickling a copy. `fn` is called as `fn(view, *args)`
+        with a memoryview that is only valid for the duration of the call.
+
+        Raises `DeadlineExceeded` when `deadline` passes first (before the job
+        started or while waiting for it) and a plain `TimeoutError` when
+        `timeout` runs out first. Either way the segment stays alive until a
+        worker that already picked the job up is done with it.
+        """
+        _check_deadline(deadline)
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        future = None
+        try:
+            shm.buf[:len(data)] = data
+            future = self.process_pool.submit(_run_job_shm, fn, shm.name, len(data), args, deadline)
+            return await self._await(future, timeout, deadline)
+        finally:
+            if future is None or future.done():
+                _release_shm(shm)
+            else:
+                # Timed out while a worker already has the job, it still needs the segment.
+                future.add_done_callback(lambda _: _release_shm(shm))
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
+
+
+@functools.cache
+def default_executor() -> ExecutorService:
+    """The process wide executor shared by the adapter and all bots."""
+    return ExecutorService()
@@ -5,3 +5,7 @@ def calc_crc32_checksum(data_bytes: bytes) -> str:
     crc32_val = zlib.crc32(data_bytes) & 0xFFFFFFFF
     crc32_bytes = crc32_val.to_bytes(4, byteorder='big')
     return base64.b64encode(crc32_bytes).decode('utf-8')
+
+
+def to_jpeg_data_uri(data: bytes | memoryview) -> str:
+    return 'data:image/jpeg;base64,' + base64.b64encode(data).decode('utf-8')
@@ -0,0 +1,131 @@
+# http_clients.py
+import functools
+import http.cookiejar
+import logging
+from typing import Any
+
+import httpx
+
+from gamebot import metrics
+
+logger = logging.getLogger(__name__)
+
+class HttpClients:
+    """
+    Process wide registry of outbound HTTP clients, one pooled
+    `httpx.AsyncClient` per host so every host gets its own connection
+    limit and warm keep-alive connections are reused across fetches and
+    uploads.
+
+    Clients never store cookies, so accounts sharing a host can not leak
+    sessions into each other; read `response.cookies` instead.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 10,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        http2: bool = True,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.configure(
+            max_connections_per_host=max_connections_per_host,
+            keepalive_expiry=keepalive_expiry,
+            timeout=timeout,
+            connect_timeout=connect_timeout,
+            http2=http2,
+        )
+        self.transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def configure(
+        self,
+        max_connections_per_host: int,
+        keepalive_expiry: float,
+        timeout: float,
+        connect_timeout: float,
+        http2: bool,
+    ) -> None:
+        """Applies to clients created afterwards, call it before the first request."""
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_connections_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2
+
+    def client_for(self, url: str | httpx.URL) -> httpx.AsyncClient:
+        host = httpx.URL(str(url)).host
+        client = self._clients.get(host)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport,
+                cookies=http.cookiejar.CookieJar(
+                    policy=http.cookiejar.DefaultCookiePolicy(allowed_domains=[]),
+                ),
+            )
+            self._clients[host] = client
+            self._stats[host] = {'requests': 0, 'errors': 0, 'in_flight': 0}
+        return client
+
+    async def request(self, method: str, url: str | httpx.URL, **kwargs: Any) -> httpx.Response:
+        client = self.client_for(url)
+        stats = self._stats[httpx.URL(str(url)).host]
+        stats['requests'] += 1
+        stats['in_flight'] += 1
+        try:
+            return await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            stats['errors'] += 1
+            raise
+        finally:
+            stats['in_flight'] -= 1
+
+    async def get(self, url: str | httpx.URL, **kwargs: Any) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str | httpx.URL, **kwargs: Any) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url: str | httpx.URL, **kwargs: Any) -> httpx.Response:
+        return await self.request('PUT', url, **kwargs)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Request counters per host, plus the pool state where httpx lets us see it."""
+        result = {}
+        for host, client in self._clients.items():
+            host_stats = result[host] = dict(self._stats[host])
+            # httpx does not expose its pool, the pool fields are left out if its internals move
+            pool = getattr(getattr(client, '_transport', None), '_pool', None)
+            connections = getattr(pool, 'connections', None)
+            if connections is not None:
+                host_stats['connections'] = len(connections)
+                host_stats['idle_connections'] = sum(1 for connection in connections if connection.is_idle())
+        return result
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            f'{host}.{key}': value
+            for host, host_stats in self.stats().items()
+            for key, value in host_stats.items()
+        }
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+@functools.cache
+def default_http_clients() -> HttpClients:
+    """The registry shared by the adapters and all bots."""
+    clients = HttpClients()
+    metrics.register('http', clients.metrics)
+    return clients
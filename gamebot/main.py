@@ -1,19 +1,23 @@
 # main.py
 import asyncio
+import functools
 import os
 from pathlib import Path
 import sys
 import logging
+from typing import Any
 import yaml
 import pydantic
 
-from gamebot.adapters.blhblh import BlhBlhAdapter, Message
-from gamebot.bots.blackjack.blackjack_bot import BlackjackBot
-from gamebot.bots.cat.cat_bot import CatBot
-from gamebot.bots.coin_bot import CoinBot
-from gamebot.bots.dice_bot import DiceBot
-from gamebot.bots.dog.dog_bot import DogBot
-from gamebot.bots.log_bot import LogBot
+from gamebot import metrics
+from gamebot.adapters.blhblh import BlhBlhAdapter
+from gamebot.adapters.hub import AdapterHub
+from gamebot.bus import BusServer
+from gamebot.config_watcher import ConfigWatcher
+from gamebot.http_clients import default_http_clients
+from gamebot.recorder import Recorder
+from gamebot.watchdog import LoopWatchdog
+from gamebot.bots.registry import DEFAULT_PLUGINS, BotPlugin, PluginError, resolve_plugins
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -24,126 +28,280 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class WhitelistConfig(pydantic.BaseModel):
-    whitelisted_users: set[str]
+class AdapterConfig(pydantic.BaseModel):
+    name: str
+    username: str
+    password: pydantic.SecretStr
+    # Pending replies per room before the oldest gets dropped
+    outbound_maxsize: int = 100
+
+
+class BusConfig(pydantic.BaseModel):
+    """Runs every plugin as its own worker process, see `gamebot.bus`."""
+    path: str = '/tmp/gamebot.sock'
+    # Messages a worker may have outstanding before the adapter holds back
+    credits: int = 32
+
+
+class HttpConfig(pydantic.BaseModel):
+    """Settings of the shared outbound http clients, see `gamebot.http_clients`."""
+    max_connections_per_host: int = 10
+    keepalive_expiry: float = 60.0
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    http2: bool = True
+
+
+class WatchdogConfig(pydantic.BaseModel):
+    """Event loop lag monitor, see `gamebot.watchdog`."""
+    interval: float = 0.1
+    # Stalls longer than this get their stack logged
+    block_threshold: float = 0.25
+
+
+class RecorderConfig(pydantic.BaseModel):
+    """Records the raw Socket.IO traffic for `gamebot.replay`."""
+    path: str = '/config/recording.jsonl.gz'
+    flush_interval: float = 1.0
+
+
+class ReloadConfig(pydantic.BaseModel):
+    """Watches the config file and applies bot sections without a restart."""
+    interval: float = 2.0
 
 
 class ConfigModel(pydantic.BaseModel):
-    dog_bot: WhitelistConfig
-    cat_bot: WhitelistConfig
-    blackjack_bot: WhitelistConfig
+    """
+    Top level config. `plugins` lists the bots to run and `adapters` the
+    accounts to connect with (defaults to one account from the `blh_user`
+    and `blh_pw` environment variables). With `bus` set, bots run as
+    separate worker processes instead of in the adapter process. Every other key is the config
+    section of the bot with that name and is validated against the bot's
+    own `config_model` once the bot is loaded.
+    """
+    model_config = pydantic.ConfigDict(extra='allow')
 
+    adapters: list[AdapterConfig] = []
+    bus: BusConfig | None = None
+    http: HttpConfig = HttpConfig()
+    watchdog: WatchdogConfig | None = None
+    recorder: RecorderConfig | None = None
+    reload: ReloadConfig | None = ReloadConfig()
+    plugins: list[str] = pydantic.Field(default_factory=lambda: list(DEFAULT_PLUGINS))
 
+    def section(self, name: str) -> Any:
+        return (self.model_extra or {}).get(name)
 
-# --- Main application logic ---
-async def main():
-    logger.info("Starting BlhBlh Bot Application...")
 
+def build_bots(config: ConfigModel, adapter: BlhBlhAdapter | AdapterHub) -> tuple[dict[str, BotPlugin], dict[str, Any]]:
+    """
+    Imports and constructs only the bots enabled in the config. Returns the
+    resolved plugins and the bots, both by plugin name.
+    """
+    plugins = {plugin.name: plugin for plugin in resolve_plugins(config.plugins)}
+    parsed = {name: plugin.parse_config(config.section(name)) for name, plugin in plugins.items()}
 
-    username = os.environ.get('blh_user')
-    password = os.environ.get('blh_pw')
-    
-    config_path = Path('/config/config.yaml')
-    if not config_path.exists():
+    bots = {
+        name: plugin.build(
+            parsed[name],
+            subscription=adapter.subscribe(name),
+            topic=adapter.topic,
+        )
+        for name, plugin in plugins.items()
+    }
+    return plugins, bots
+
+
+# Settings the running process can't pick up, a change only takes effect after a restart
+RESTART_ONLY = ('adapters', 'bus', 'http', 'watchdog', 'recorder', 'reload', 'plugins')
+
+
+def reload_config(current: ConfigModel, new: ConfigModel, plugins: dict[str, BotPlugin], bots: dict[str, Any]) -> bool:
+    """
+    Applies a reloaded config to running bots. Every bot section is validated
+    before the first bot is touched, so either all bots get the new config or
+    none does. Bots pick it up through `reconfigure(config)`. `plugins` are
+    the ones the bots were built from, so nothing is resolved or imported here.
+    """
+    changed = [key for key in RESTART_ONLY if getattr(current, key) != getattr(new, key)]
+    if changed:
+        logger.warning(f'Config: {", ".join(changed)} changed, restart to apply.')
+
+    try:
+        parsed = {name: plugins[name].parse_config(new.section(name)) for name in bots}
+    except pydantic.ValidationError as e:
+        logger.error(f'Invalid config: {e}')
+        return False
+
+    for name, bot in bots.items():
+        if current.section(name) == new.section(name):
+            continue
+        reconfigure = getattr(bot, 'reconfigure', None)
+        if reconfigure is None:
+            logger.warning(f"Config: '{name}' changed, restart to apply.")
+        else:
+            reconfigure(parsed[name])
+            logger.info(f"Config: Applied new '{name}' config.")
+    return True
+
+
+def config_path() -> Path:
+    return Path(os.environ.get('GAMEBOT_CONFIG', '/config/config.yaml'))
+
+
+def load_config(path: Path) -> ConfigModel | None:
+    if not path.exists():
         logger.error('config file doesnt exist')
 
-        with config_path.open('w') as f:
+        with path.open('w') as f:
             f.write('put config here')
 
-        return
-    
-    with config_path.open() as config_f:
-        config_parsed = yaml.safe_load(config_f)
+        return None
+
+    return read_config(path)
+
+
+def read_config(path: Path) -> ConfigModel | None:
+    try:
+        with path.open() as config_f:
+            config_parsed = yaml.safe_load(config_f)
+    except (OSError, yaml.YAMLError) as e:
+        logger.error(f'Can not read config: {e}')
+        return None
 
     try:
-        config = ConfigModel.model_validate(config_parsed)
+        return ConfigModel.model_validate(config_parsed)
     except pydantic.ValidationError as e:
         logger.error(f'Invalid config: {e}')
-        return
-    
+        return None
 
-    if not username or not password:
-        logger.error('no user or pw found')
-        return
 
-    blhblh_adapter = BlhBlhAdapter(
-        username=username,
-        password=password
-    )
+async def run_worker_process(plugin_name: str):
+    """Runs one bus worker and restarts it whenever it exits."""
+    while True:
+        process = await asyncio.create_subprocess_exec(sys.executable, '-m', 'gamebot.worker', plugin_name)
+        return_code = await process.wait()
+        logger.warning(f"Worker '{plugin_name}' exited with code {return_code}, restarting.")
+        await asyncio.sleep(1)
 
 
-    dog_bot = DogBot(
-        whitelisted_users=config.dog_bot.whitelisted_users, 
-        subscription=blhblh_adapter.subscribe('DogBot'),
-        topic=blhblh_adapter.topic    
-    )
+# --- Main application logic ---
+async def main():
+    logger.info("Starting BlhBlh Bot Application...")
+
 
-    cat_bot = CatBot(
-        whitelisted_users=config.cat_bot.whitelisted_users, 
-        subscription=blhblh_adapter.subscribe('CatBot'),
-        topic=blhblh_adapter.topic    
-    )
+    username = os.environ.get('blh_user')
+    password = os.environ.get('blh_pw')
+    
+    config = load_config(config_path())
+    if config is None:
+        return
 
+    default_http_clients().configure(**config.http.model_dump())
 
-    log_bot = LogBot(
-        subscription=blhblh_adapter.subscribe('LogBot'),
-    )
 
-    blackjack_bot = BlackjackBot(
-        whitelisted_users=config.blackjack_bot.whitelisted_users,
-        subscription=blhblh_adapter.subscribe('Blackjack'),
-        topic=blhblh_adapter.topic,
-    )
+    recorder = Recorder(**config.recorder.model_dump()) if config.recorder is not None else None
 
-    coin_bot = CoinBot(
-        subscription=blhblh_adapter.subscribe('Coin'),
-        topic=blhblh_adapter.topic,
-    )
+    if config.adapters:
+        adapters = [
+            BlhBlhAdapter(
+                username=adapter_config.username,
+                password=adapter_config.password.get_secret_value(),
+                name=adapter_config.name,
+                outbound_maxsize=adapter_config.outbound_maxsize,
+                recorder=recorder,
+            )
+            for adapter_config in config.adapters
+        ]
+    elif not username or not password:
+        logger.error('no user or pw found')
+        return
+    else:
+        adapters = [
+            BlhBlhAdapter(
+                username=username,
+                password=password,
+                recorder=recorder,
+            )
+        ]
 
-    dice_bot = DiceBot(
-        subscription=blhblh_adapter.subscribe('Dice'),
-        topic=blhblh_adapter.topic,
-    )
+    try:
+        hub = AdapterHub(adapters)
+        if config.bus is None:
+            plugins, bots = build_bots(config, hub)
+        else:
+            worker_plugins = resolve_plugins(config.plugins)
+            # Validated here too, a bad section would otherwise only fail inside the workers, restarting forever
+            for plugin in worker_plugins:
+                plugin.parse_config(config.section(plugin.name))
+            worker_names = [plugin.name for plugin in worker_plugins]
+            bus_server = BusServer(hub, config.bus.path, worker_names)
+    except (ValueError, PluginError, pydantic.ValidationError) as e:
+        logger.error(f'Invalid config: {e}')
+        return
 
 
     tasks = {
-        'blh_connect': {
+        'route_replies': {
             'task': None,
-            'coro': blhblh_adapter.reconnect_task,
+            'coro': hub.route_replies,
         },
-        'blh': {
+        'metrics': {
             'task': None,
-            'coro': blhblh_adapter.connect_and_poll,
+            'coro': metrics.log_metrics,
         },
-        'publish': {
+    }
+    if recorder is not None:
+        tasks['recorder'] = {
             'task': None,
-            'coro': blhblh_adapter.post_messages
-        },
-        'dog': {
+            'coro': recorder.flush_task,
+        }
+    if config.watchdog is not None:
+        tasks['watchdog'] = {
             'task': None,
-            'coro': dog_bot.work,
-        },
-        'cat': {
+            'coro': LoopWatchdog(**config.watchdog.model_dump()).run,
+        }
+    for name, blhblh_adapter in hub.adapters.items():
+        tasks[f'{name}_connect'] = {
             'task': None,
-            'coro': cat_bot.work,
-        },
-        'log': {
+            'coro': blhblh_adapter.reconnect_task,
+        }
+        tasks[f'{name}_poll'] = {
             'task': None,
-            'coro': log_bot.work,
-        },
-        'blackjack': {
+            'coro': blhblh_adapter.connect_and_poll,
+        }
+        tasks[f'{name}_publish'] = {
             'task': None,
-            'coro': blackjack_bot.work,
-        },
-        'coin': {
+            'coro': blhblh_adapter.post_messages,
+        }
+    if config.reload is not None and config.bus is None:
+        # With a bus, every worker watches the config for its own bot
+        tasks['config_reload'] = {
             'task': None,
-            'coro': coin_bot.work,
-        },
-        'dice': {
+            'coro': ConfigWatcher(
+                config_path(),
+                current=config,
+                load=read_config,
+                apply=functools.partial(reload_config, plugins=plugins, bots=bots),
+                interval=config.reload.interval,
+            ).run,
+        }
+    if config.bus is None:
+        for name, bot in bots.items():
+            tasks[name] = {
+                'task': None,
+                'coro': bot.work,
+            }
+    else:
+        tasks['bus'] = {
             'task': None,
-            'coro': dice_bot.work,
+            'coro': bus_server.serve,
         }
-    }
+        for name in worker_names:
+            tasks[f'{name}_worker'] = {
+                'task': None,
+                'coro': functools.partial(run_worker_process, name),
+            }
 
     while True:
         for task_name, task_info in tasks.items():
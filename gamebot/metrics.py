@@ -0,0 +1,29 @@
+# metrics.py
+import asyncio
+import logging
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# name -> callable returning a flat dict of current values
+_sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register(name: str, source: Callable[[], dict[str, Any]]) -> None:
+    _sources[name] = source
+
+
+def unregister(name: str) -> None:
+    _sources.pop(name, None)
+
+
+def snapshot() -> dict[str, dict[str, Any]]:
+    return {name: source() for name, source in _sources.items()}
+
+
+async def log_metrics(interval: float = 60):
+    """Periodically writes every registered metric source to the log."""
+    while True:
+        await asyncio.sleep(interval)
+        for name, values in snapshot().items():
+            logger.info(f'metrics {name}: ' + ' '.join(f'{key}={value}' for key, value in values.items()))
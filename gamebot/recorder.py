@@ -0,0 +1,92 @@
+# recorder.py
+"""
+Opt-in recording of the raw Socket.IO traffic of an adapter, for replaying
+it offline with `gamebot.replay`.
+
+A recording is an append-only file of JSON lines, gzip compressed when the
+path ends in `.gz`. The file stays open while recording, so a compressed
+recording is one gzip stream rather than one small member per flush:
+
+    {"ts": 1760000000.123, "src": "blhblh", "kind": "messages", "data": [...]}
+    {"ts": 1760000000.456, "src": "blhblh", "kind": "ack", "data": {...}}
+"""
+import asyncio
+import gzip
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+from gamebot.executor import ExecutorService, default_executor
+
+logger = logging.getLogger(__name__)
+
+
+def _open(path: Path, mode: str) -> TextIO:
+    if path.suffix == '.gz':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return path.open(mode, encoding='utf-8')
+
+
+class Recorder:
+    """
+    Buffers records in memory and appends them to the file from a worker
+    thread, so recording never blocks the event loop. Every flush ends with
+    a gzip sync flush, so a recording can be replayed while it is still
+    being written or after the process died.
+    """
+
+    def __init__(self, path: str | Path, flush_interval: float = 1.0, executor: ExecutorService | None = None) -> None:
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.executor = executor or default_executor()
+        self._pending: list[str] = []
+        self._file: TextIO | None = None
+
+    def record(self, source: str, kind: str, data: Any) -> None:
+        self._pending.append(json.dumps(
+            {'ts': time.time(), 'src': source, 'kind': kind, 'data': data},
+            separators=(',', ':'),
+            default=str,
+        ))
+
+    def _write(self, lines: list[str]) -> None:
+        if self._file is None:
+            self._file = _open(self.path, 'a')
+        try:
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+        except OSError:
+            # Start over with a fresh handle on the next flush
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._file is not None:
+            file, self._file = self._file, None
+            file.close()
+
+    async def flush(self):
+        lines, self._pending = self._pending, []
+        if lines:
+            await self.executor.run_in_thread(self._write, lines)
+
+    async def flush_task(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError as e:
+                logger.error(f'Recorder: Can not write to {self.path}: {e}')
+
+
+def read_recording(path: str | Path) -> Iterator[dict[str, Any]]:
+    with _open(Path(path), 'r') as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        except EOFError:
+            # A gzip stream that was never closed, everything up to the last flush is there
+            logger.info(f'Recorder: {path} ends without a gzip trailer, it is still open or was not closed.')
@@ -0,0 +1,289 @@
+# replay.py
+"""
+Replays a recording made by `gamebot.recorder` through the real
+handler -> dispatch -> bots -> post_messages path, without any network:
+the Socket.IO server answers with the recorded acks and the cat/dog APIs
+and image uploads are served by a stub transport.
+
+    python -m gamebot.replay recording.jsonl.gz [--speed 0] [--config config.yaml]
+
+`--speed 0` replays as fast as possible, `--speed 1` keeps the recorded
+timing (2 is twice as fast, ...). Reports throughput and latency per stage:
+
+  ingest      handling one 'messages' event (validate, filter, sort, dedup, publish)
+  bot         message published -> reply put on the topic by the bot
+  outbound    reply on the adapter queue -> 'postMessage' emitted
+  end_to_end  message published -> 'postMessage' emitted
+"""
+import argparse
+import asyncio
+import collections
+import dataclasses
+import datetime
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from gamebot.adapters.blhblh import BlhBlhAdapter, PostMessage
+from gamebot.adapters.hub import AdapterHub
+from gamebot.adapters.outbound import OutboundQueue
+from gamebot.bots.registry import resolve_plugins
+from gamebot.http_clients import default_http_clients
+from gamebot.main import ConfigModel, read_config
+from gamebot.recorder import read_recording
+
+logger = logging.getLogger(__name__)
+
+STUB_IMAGE = os.urandom(200 * 1024)
+DEFAULT_ACK = [None, {'result': 'ok', 'picUrl': ''}]
+# Replay is over once no reply was posted for this long
+QUIET_PERIOD = 0.2
+
+
+async def _stub_upstream(request: httpx.Request) -> httpx.Response:
+    if request.method == 'PUT':
+        return httpx.Response(200)
+    if request.url.host == 'api.thecatapi.com':
+        return httpx.Response(200, json=[{'id': 'replay', 'url': 'https://cdn2.thecatapi.com/images/replay.jpg', 'width': 1, 'height': 1}])
+    if request.url.host == 'dog.ceo':
+        return httpx.Response(200, json={'message': 'https://images.dog.ceo/breeds/replay.jpg', 'status': 'success'})
+    return httpx.Response(200, content=STUB_IMAGE)
+
+
+class Stages:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = collections.defaultdict(list)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                'count': len(ordered),
+                'p50_ms': ordered[len(ordered) // 2] * 1000,
+                'p90_ms': ordered[int(len(ordered) * 0.9)] * 1000,
+                'p99_ms': ordered[int(len(ordered) * 0.99)] * 1000,
+                'max_ms': ordered[-1] * 1000,
+            }
+        return result
+
+
+class SubscriptionProbe(asyncio.Queue):
+    """Subscription queue that remembers when the message a bot took was published."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._published: dict[int, float] = {}
+        self.last_published_at: float | None = None
+
+    def put_nowait(self, item):
+        self._published[id(item)] = time.perf_counter()
+        super().put_nowait(item)
+
+    def get_nowait(self):
+        item = super().get_nowait()
+        self.last_published_at = self._published.pop(id(item))
+        return item
+
+
+class ReplyProbe:
+    """Stands in for the topic of one bot and times its replies."""
+
+    def __init__(self, topic: asyncio.Queue, subscription: SubscriptionProbe, stages: Stages, origins: dict[int, float]) -> None:
+        self.topic = topic
+        self.subscription = subscription
+        self.stages = stages
+        self.origins = origins
+
+    async def put(self, post_msg: PostMessage):
+        published_at = self.subscription.last_published_at
+        if published_at is not None:
+            self.stages.add('bot', time.perf_counter() - published_at)
+            self.origins[id(post_msg)] = published_at
+        await self.topic.put(post_msg)
+
+
+class OutboundProbe(OutboundQueue):
+    """Adapter topic that knows which reply `post_messages` is working on."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._queued: dict[int, float] = {}
+        self.current: tuple[int, float] | None = None
+
+    def put_nowait(self, item):
+        self._queued[id(item)] = time.perf_counter()
+        super().put_nowait(item)
+
+    def get_nowait(self):
+        item = super().get_nowait()
+        self.current = (id(item), self._queued.pop(id(item)))
+        return item
+
+
+class OfflineSio:
+    connected = True
+
+    def __init__(self, outbound: OutboundProbe, acks: collections.deque, stages: Stages, origins: dict[int, float]) -> None:
+        self.outbound = outbound
+        self.acks = acks
+        self.stages = stages
+        self.origins = origins
+        self.posted = 0
+        self.last_post_at = 0.0
+
+    async def emit(self, event: str, data: Any = None, callback=None):
+        if event != 'postMessage':
+            return
+
+        now = time.perf_counter()
+        item_id, queued_at = self.outbound.current
+        self.outbound.current = None
+        self.stages.add('outbound', now - queued_at)
+        published_at = self.origins.pop(item_id, None)
+        if published_at is not None:
+            self.stages.add('end_to_end', now - published_at)
+
+        self.posted += 1
+        self.last_post_at = now
+        if callback is not None:
+            callback(*(self.acks.popleft() if self.acks else DEFAULT_ACK))
+
+    async def disconnect(self):
+        pass
+
+
+@dataclasses.dataclass
+class ReplayReport:
+    events: int
+    messages: int
+    replies: int
+    seconds: float
+    stages: dict[str, dict[str, float]]
+
+    def render(self) -> str:
+        lines = [
+            f'{self.events} events, {self.messages} messages, {self.replies} replies in {self.seconds:.2f}s '
+            f'({self.messages / self.seconds:.0f} msg/s, {self.replies / self.seconds:.0f} replies/s)',
+        ]
+        for stage, stats in self.stages.items():
+            lines.append(
+                f'  {stage:<11} n={stats["count"]:<6} p50 {stats["p50_ms"]:8.3f}ms  p90 {stats["p90_ms"]:8.3f}ms'
+                f'  p99 {stats["p99_ms"]:8.3f}ms  max {stats["max_ms"]:8.3f}ms'
+            )
+        return '\n'.join(lines)
+
+
+def default_replay_config(records: list[dict[str, Any]]) -> ConfigModel:
+    """All built-in bots, with every user of the recording whitelisted."""
+    users = sorted({msg['user'] for record in records if record['kind'] == 'messages' for msg in record['data']})
+    whitelist = {'whitelisted_users': users}
+    return ConfigModel.model_validate({'dog_bot': whitelist, 'cat_bot': whitelist, 'blackjack_bot': whitelist})
+
+
+async def replay(records: list[dict[str, Any]], config: ConfigModel, speed: float = 0) -> ReplayReport:
+    default_http_clients().transport = httpx.MockTransport(_stub_upstream)
+    stages = Stages()
+    origins: dict[int, float] = {}
+
+    sources = list(dict.fromkeys(record['src'] for record in records)) or ['blhblh']
+    adapters: dict[str, BlhBlhAdapter] = {}
+    for source in sources:
+        adapter = BlhBlhAdapter('replay', 'replay', name=source)
+        adapter.only_after = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+        adapter.topic = OutboundProbe()
+        acks = collections.deque(record['data'] for record in records if record['kind'] == 'ack' and record['src'] == source)
+        adapter.sio = OfflineSio(adapter.topic, acks, stages, origins)
+        adapter.sio_connected_event.set()
+        adapters[source] = adapter
+    hub = AdapterHub(list(adapters.values()))
+
+    bots = []
+    subscriptions = []
+    for plugin in resolve_plugins(config.plugins):
+        subscription = SubscriptionProbe()
+        for adapter in adapters.values():
+            adapter.subscribe(plugin.name, subscription)
+        bots.append(plugin.build(
+            plugin.parse_config(config.section(plugin.name)),
+            subscription=subscription,
+            topic=ReplyProbe(hub.topic, subscription, stages, origins),
+        ))
+        subscriptions.append(subscription)
+
+    tasks = [asyncio.create_task(hub.route_replies())]
+    tasks += [asyncio.create_task(adapter.post_messages()) for adapter in adapters.values()]
+    tasks += [asyncio.create_task(bot.work()) for bot in bots]
+
+    events = [record for record in records if record['kind'] == 'messages']
+    start = time.perf_counter()
+    first_ts = events[0]['ts'] if events else 0
+    try:
+        for record in events:
+            if speed > 0:
+                delay = (record['ts'] - first_ts) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            handle_start = time.perf_counter()
+            await adapters[record['src']].handle_messages(record['data'])
+            stages.add('ingest', time.perf_counter() - handle_start)
+            await asyncio.sleep(0)
+
+        ingest_end = time.perf_counter()
+
+        # Bots may still be busy with an empty queue, wait until nothing moves anymore.
+        queues = [*subscriptions, hub.topic, *(adapter.topic for adapter in adapters.values())]
+        posted = -1
+        while posted != sum(adapter.sio.posted for adapter in adapters.values()):
+            posted = sum(adapter.sio.posted for adapter in adapters.values())
+            while any(queue.qsize() for queue in queues) or any(adapter.topic.current for adapter in adapters.values()):
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(QUIET_PERIOD)
+
+        last_post = max((adapter.sio.last_post_at for adapter in adapters.values()), default=ingest_end)
+        seconds = max(ingest_end, last_post) - start
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return ReplayReport(
+        events=len(events),
+        messages=sum(len(record['data']) for record in events),
+        replies=sum(adapter.sio.posted for adapter in adapters.values()),
+        seconds=seconds,
+        stages=stages.summary(),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded Socket.IO session offline.')
+    parser.add_argument('recording', type=Path)
+    parser.add_argument('--speed', type=float, default=0, help='0 = as fast as possible, 1 = recorded timing')
+    parser.add_argument('--config', type=Path, help='config.yaml to take plugins and whitelists from')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    if args.config is not None and not args.config.is_file():
+        parser.error(f'config file {args.config} does not exist')
+
+    records = list(read_recording(args.recording))
+    config = read_config(args.config) if args.config else default_replay_config(records)
+    if config is None:
+        parser.exit(1)
+
+    report = asyncio.run(replay(records, config, speed=args.speed))
+    print(report.render())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# watchdog.py
+import asyncio
+import collections
+import logging
+import statistics
+import sys
+import threading
+import time
+import traceback
+from typing import Any
+
+from gamebot import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LoopWatchdog:
+    """
+    Measures event loop scheduling lag and catches blocking calls.
+
+    A task on the loop wakes up every `interval` seconds and records how
+    late it was. A daemon thread checks that heartbeat; when the loop has
+    not come back for longer than `block_threshold`, it grabs the stack of
+    the loop thread, which is the code that is blocking it, and logs it.
+    """
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.25, window: int = 1024) -> None:
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.lags: collections.deque[float] = collections.deque(maxlen=window)
+        self.blocked_count = 0
+        self._beat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._sampler: threading.Thread | None = None
+        metrics.register('loop', self.metrics)
+
+    async def run(self):
+        self._loop_thread_id = threading.get_ident()
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample, name='gamebot-watchdog', daemon=True)
+            self._sampler.start()
+
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(loop.time() - start - self.interval, 0.0))
+
+    def _sample(self):
+        reported_beat = None
+        while True:
+            time.sleep(self.block_threshold / 2)
+            beat = self._beat
+            blocked_for = time.monotonic() - beat - self.interval
+            if blocked_for < self.block_threshold or beat == reported_beat:
+                continue
+
+            # One report per stall, the next beat resets it.
+            reported_beat = beat
+            self.blocked_count += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '<no frame>\n'
+            logger.warning(f'LoopWatchdog: Event loop blocked for {blocked_for * 1000:.0f}ms at:\n{stack}')
+
+    def percentiles(self) -> dict[str, float]:
+        if len(self.lags) < 2:
+            return {}
+        cuts = statistics.quantiles(self.lags, n=100, method='inclusive')
+        return {
+            'p50_ms': round(cuts[49] * 1000, 2),
+            'p90_ms': round(cuts[89] * 1000, 2),
+            'p99_ms': round(cuts[98] * 1000, 2),
+            'max_ms': round(max(self.lags) * 1000, 2),
+        }
+
+    def metrics(self) -> dict[str, Any]:
+        return {**self.percentiles(), 'blocked': self.blocked_count}
@@ -0,0 +1,72 @@
+# worker.py
+"""
+Entry point of a bus worker process: `python -m gamebot.worker <plugin>`.
+Started and restarted by `gamebot.main` when `bus` is set in the config.
+"""
+import asyncio
+import functools
+import logging
+import sys
+
+from gamebot import metrics
+from gamebot.bus import BusWorker
+from gamebot.config_watcher import ConfigWatcher
+from gamebot.http_clients import default_http_clients
+from gamebot.watchdog import LoopWatchdog
+from gamebot.bots.registry import resolve_plugins
+from gamebot.main import config_path, load_config, read_config, reload_config
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(plugin_name: str):
+    config = load_config(config_path())
+    if config is None or config.bus is None:
+        logger.error('Workers need a config with a `bus` section.')
+        return
+
+    default_http_clients().configure(**config.http.model_dump())
+
+    plugin = resolve_plugins([plugin_name])[0]
+    worker = BusWorker(plugin.name, config.bus.path, credits=config.bus.credits)
+    bot = plugin.build(
+        plugin.parse_config(config.section(plugin.name)),
+        subscription=worker.subscription,
+        topic=worker.topic,
+    )
+
+    tasks = [
+        asyncio.create_task(worker.run()),
+        asyncio.create_task(bot.work()),
+        asyncio.create_task(metrics.log_metrics()),
+    ]
+    if config.reload is not None:
+        watcher = ConfigWatcher(
+            config_path(),
+            current=config,
+            load=read_config,
+            apply=functools.partial(reload_config, plugins={plugin.name: plugin}, bots={plugin.name: bot}),
+            interval=config.reload.interval,
+        )
+        tasks.append(asyncio.create_task(watcher.run()))
+    if config.watchdog is not None:
+        tasks.append(asyncio.create_task(LoopWatchdog(**config.watchdog.model_dump()).run()))
+
+    # Whichever stops first takes the process down, the adapter restarts it.
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        task.result()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print('usage: python -m gamebot.worker <plugin>')
+        sys.exit(2)
+
+    try:
+        asyncio.run(run_worker(sys.argv[1]))
+    except Exception as e:
+        logger.critical(f"Worker '{sys.argv[1]}' crashed: {e}", exc_info=True)
+        sys.exit(1)
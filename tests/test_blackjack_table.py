@@ -0,0 +1,83 @@
+from gamebot.bots.blackjack.blackjack_table import BlackjackTable, Phase, Shoe
+
+
+class FixedShoe(Shoe):
+    """Deals the given cards in order."""
+
+    def __init__(self, cards: list[str]) -> None:
+        super().__init__(decks=1)
+        self.cards = list(cards)
+
+    def draw(self) -> str:
+        self.remaining -= 1
+        return self.cards.pop(0)
+
+
+def make_table(cards: list[str]) -> BlackjackTable:
+    return BlackjackTable(FixedShoe(cards), join_window=10, act_window=10)
+
+
+def test_dealer_natural_keeps_players_seated():
+    # Deal order per card round: alice, bob, dealer
+    table = make_table(['9', '10', 'A', '7', '8', 'K'])
+    table.join('alice', 'Alice', now=0)
+    table.join('bob', 'Bob', now=0)
+
+    post = table.tick(now=10)
+
+    assert 'Alice: 9, 7 (16) - loses' in post
+    assert 'Next hand' in post
+    assert list(table.seats) == ['alice', 'bob']
+    assert table.phase is Phase.JOINING
+
+
+def test_player_who_skips_an_act_round_loses_the_seat():
+    table = make_table(['9', '10', '5', '7', '8', 'K', '10'])
+    table.join('alice', 'Alice', now=0)
+    table.join('bob', 'Bob', now=0)
+    table.tick(now=10)
+    assert table.phase is Phase.ACTING
+
+    table.act('alice', 'stand', now=11)
+    table.tick(now=20)
+
+    assert list(table.seats) == ['alice']
+
+
+def test_all_players_acting_closes_the_round_early():
+    table = make_table(['9', '10', '5', '7', '8', 'K', '2', '10'])
+    table.join('alice', 'Alice', now=0)
+    table.join('bob', 'Bob', now=0)
+    table.tick(now=10)
+
+    table.act('alice', 'hit', now=11)
+    assert table.tick(now=11) is None
+    table.act('bob', 'stand', now=12)
+    post = table.tick(now=12)
+
+    assert 'Alice: 9, 7, 2 (18)' in post
+    assert table.phase is Phase.ACTING
+
+
+def test_leave_mid_hand_stands_and_frees_the_seat():
+    table = make_table(['9', '10', '5', '7', '8', 'K', '10'])
+    table.join('alice', 'Alice', now=0)
+    table.join('bob', 'Bob', now=0)
+    table.tick(now=10)
+
+    table.act('alice', 'stand', now=11)
+    table.leave('bob', now=12)
+    post = table.tick(now=12)
+
+    assert 'Bob: 10, 8 (18)' in post
+    assert list(table.seats) == ['alice']
+    assert table.phase is Phase.JOINING
+
+
+def test_last_player_leaving_closes_the_table():
+    table = make_table([])
+    table.join('alice', 'Alice', now=0)
+    table.leave('alice', now=1)
+
+    assert table.phase is Phase.IDLE
+    assert table.tick(now=10) is None
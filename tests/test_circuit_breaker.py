@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from gamebot.bots.cat.cat_api import CatImageFetcher
+from gamebot.bots.dog.dog_api import DogImageFetcher, UnknownBreedError
+from gamebot.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState, RecentCache
+
+
+async def ok() -> str:
+    return 'ok'
+
+
+async def fail() -> str:
+    raise ConnectionError('down')
+
+
+def call(breaker: CircuitBreaker, fn) -> str:
+    return asyncio.run(breaker.call(fn))
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+
+
+def wait_out_reset(breaker: CircuitBreaker) -> None:
+    breaker._opened_at -= breaker.reset_timeout
+
+
+def test_failures_within_the_window_open_the_circuit():
+    breaker = CircuitBreaker('test', failure_threshold=2, window=3, reset_timeout=30)
+
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    for _ in range(3):
+        assert call(breaker, ok) == 'ok'
+    # The first failure has left the window
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert breaker.state is CircuitState.CLOSED
+
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        call(breaker, ok)
+    assert breaker.counters['rejected'] == 1
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+    open_breaker(breaker)
+
+    wait_out_reset(breaker)
+    assert breaker.allow()
+    assert breaker.state is CircuitState.HALF_OPEN
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record(False)
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        call(breaker, ok)
+
+    wait_out_reset(breaker)
+    assert call(breaker, ok) == 'ok'
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker('test', failure_threshold=1, slow_call_seconds=0.01)
+
+    async def slow() -> str:
+        await asyncio.sleep(0.02)
+        return 'late'
+
+    assert call(breaker, slow) == 'late'
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_excluded_errors_count_as_successes():
+    breaker = CircuitBreaker('test', failure_threshold=1, excluded=(UnknownBreedError,))
+
+    async def unknown() -> str:
+        raise UnknownBreedError('Unknown breed: corgo')
+
+    with pytest.raises(UnknownBreedError):
+        call(breaker, unknown)
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_recent_cache_picks_by_key():
+    cache = RecentCache(maxlen=2)
+    cache.add('pug', b'1')
+    cache.add(None, b'2')
+    cache.add(None, b'3')
+
+    assert cache.pick('pug') is None
+    assert cache.pick(None) in (b'2', b'3')
+
+
+def test_dog_fetcher_serves_the_cache_while_the_circuit_is_open():
+    fetcher = DogImageFetcher()
+    fetcher.breaker.failure_threshold = 1
+    images = iter([b'fresh'])
+
+    async def fetch_image_bytes(breed=None, sub_breed=None) -> bytes:
+        try:
+            return next(images)
+        except StopIteration:
+            raise ConnectionError('down') from None
+
+    fetcher.fetch_image_bytes = fetch_image_bytes
+
+    assert asyncio.run(fetcher.fetch_image_bytes_or_cached('pug')) == (b'fresh', False)
+    assert asyncio.run(fetcher.fetch_image_bytes_or_cached('pug')) == (b'fresh', True)
+    assert fetcher.breaker.state is CircuitState.OPEN
+    assert asyncio.run(fetcher.fetch_image_bytes_or_cached('pug')) == (b'fresh', True)
+    assert fetcher.breaker.counters['cache_hits'] == 2
+
+    with pytest.raises(ConnectionError, match=r"circuit open: CircuitOpenError\(\"Circuit 'dog.ceo' is open.\"\)"):
+        asyncio.run(fetcher.fetch_image_bytes_or_cached('husky'))
+
+
+def test_cat_fetcher_names_a_timeout_when_nothing_is_cached():
+    fetcher = CatImageFetcher()
+
+    async def fetch_image_bytes() -> bytes:
+        await asyncio.sleep(1)
+
+    fetcher.fetch_image_bytes = fetch_image_bytes
+
+    with pytest.raises(ConnectionError, match=r'circuit closed: TimeoutError\(\)'):
+        asyncio.run(fetcher.fetch_image_bytes_or_cached(deadline=0.01))
@@ -0,0 +1,87 @@
+import pytest
+
+from gamebot.bots.dice import dice_engine
+from gamebot.bots.dice.dice_engine import DiceError, DiceTerm, RollResult, TermResult, parse
+
+
+def test_parse_dice_terms():
+    expression = parse('4d6kh3 + 2d8kl1 - d% + 3d6!')
+
+    assert expression.terms == (
+        DiceTerm(sign=1, count=4, sides=6, keep='kh', keep_n=3),
+        DiceTerm(sign=1, count=2, sides=8, keep='kl', keep_n=1),
+        DiceTerm(sign=-1, count=1, sides=100),
+        DiceTerm(sign=1, count=3, sides=6, explode=True),
+    )
+    assert expression.constant == 0
+    assert str(expression) == '4d6kh3+2d8kl1-1d100+3d6!'
+
+
+def test_parse_advantage_and_modifiers():
+    expression = parse('adv + 5 - 2 + dis')
+
+    assert expression.terms == (
+        DiceTerm(sign=1, count=2, sides=20, keep='kh', keep_n=1),
+        DiceTerm(sign=1, count=2, sides=20, keep='kl', keep_n=1),
+    )
+    assert expression.constant == 3
+    assert str(expression) == '2d20kh1+2d20kl1+3'
+
+
+def test_parse_negative_terms():
+    assert str(parse('-3')) == '-3'
+    assert str(parse('-2d6+1')) == '-2d6+1'
+    assert parse('-2d6').terms[0].sign == -1
+
+
+@pytest.mark.parametrize('text, error', [
+    ('', 'Empty'),
+    ('2d6 3', 'Can not read'),
+    ('2x6', 'Can not read'),
+    ('0d6', 'at least one die'),
+    ('1d0', 'sides'),
+    ('2d6kh3', 'keep between 1 and 2'),
+    ('1d1!', 'explodes forever'),
+    (f'{dice_engine.MAX_DICE + 1}d6', f'At most {dice_engine.MAX_DICE} dice'),
+    (f'{dice_engine.MAX_DICE}d6+1d6', f'At most {dice_engine.MAX_DICE} dice'),
+    ('+'.join(['d6'] * (dice_engine.MAX_TERMS + 1)), 'dice terms'),
+])
+def test_parse_rejects(text, error):
+    with pytest.raises(DiceError, match=error):
+        parse(text)
+
+
+def test_max_dice_rolls_a_histogram():
+    result = dice_engine.roll(parse(f'{dice_engine.MAX_DICE}d6'))
+
+    histogram = result.terms[0].histogram
+    assert [label for label, _ in histogram] == ['1', '2', '3', '4', '5', '6']
+    assert sum(count for _, count in histogram) == dice_engine.MAX_DICE
+    assert result.total == sum(int(label) * count for label, count in histogram)
+
+
+def test_keep_highest_and_exploding_dice():
+    result = dice_engine.roll(parse('4d6kh3'))
+    kept, dropped = result.terms[0].listed
+    assert len(kept) == 3 and len(dropped) == 1
+    assert min(kept) >= dropped[0]
+    assert result.total == sum(kept)
+
+    result = dice_engine.roll(parse('20d2!'))
+    assert all(value % 2 for value in result.terms[0].listed[0] if value > 2)
+
+
+def listed(term: str, kept: list[int], dropped: list[int] = ()) -> TermResult:
+    term = parse(term).terms[0]
+    return TermResult(term=term, total=sum(kept), listed=(kept, list(dropped)), histogram=None)
+
+
+@pytest.mark.parametrize('text, terms, total, rendered', [
+    ('0', [], 0, '0 = 0'),
+    ('-3', [], -3, '-3 = -3'),
+    ('2d6+3', [listed('2d6', [4, 5])], 12, '2d6 [4, 5] + 3 = 12'),
+    ('-1d6', [listed('-1d6', [4])], -4, '-1d6 [4] = -4'),
+    ('4d6kh3-1', [listed('4d6kh3', [6, 5, 3], [1])], 13, '4d6kh3 [6, 5, 3, (1)] - 1 = 13'),
+])
+def test_render(text, terms, total, rendered):
+    assert RollResult(expression=parse(text), total=total, terms=terms).render() == rendered
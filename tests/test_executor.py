@@ -0,0 +1,25 @@
+import asyncio
+import time
+
+import pytest
+
+from gamebot.executor import DeadlineExceeded, ExecutorService
+
+
+@pytest.mark.parametrize('timeout, deadline_in, error', [
+    (0.05, 5.0, TimeoutError),
+    (5.0, 0.05, DeadlineExceeded),
+    (None, 0.05, DeadlineExceeded),
+    (5.0, -1.0, DeadlineExceeded),
+])
+def test_reports_the_limit_that_was_hit(timeout, deadline_in, error):
+    executor = ExecutorService(max_threads=1)
+
+    async def run():
+        await executor.run_in_thread(time.sleep, 0.3, timeout=timeout, deadline=time.time() + deadline_in)
+
+    with pytest.raises(TimeoutError) as info:
+        asyncio.run(run())
+    executor.shutdown()
+
+    assert type(info.value) is error
@@ -0,0 +1,48 @@
+from gamebot.adapters.blhblh import PostMessage, Priority
+from gamebot.adapters.outbound import OutboundQueue
+
+
+def reply(text: str, priority: Priority, sender: str) -> PostMessage:
+    return PostMessage(text=text, priority=priority, sender=sender)
+
+
+def drain(queue: OutboundQueue) -> list[str]:
+    return [queue.get_nowait().text for _ in range(queue.qsize())]
+
+
+def test_priority_then_round_robin_between_senders():
+    queue = OutboundQueue()
+    for item in [
+        reply('cat', Priority.IMAGE, 'cat_bot'),
+        reply('coin1', Priority.TEXT, 'coin_bot'),
+        reply('coin2', Priority.TEXT, 'coin_bot'),
+        reply('dice', Priority.TEXT, 'dice_bot'),
+        reply('hit', Priority.INTERACTIVE, 'blackjack_bot'),
+    ]:
+        queue.put_nowait(item)
+
+    assert drain(queue) == ['hit', 'coin1', 'dice', 'coin2', 'cat']
+
+
+def test_full_queue_drops_a_new_reply_that_is_least_important():
+    queue = OutboundQueue(maxsize=2)
+    queue.put_nowait(reply('hit1', Priority.INTERACTIVE, 'blackjack_bot'))
+    queue.put_nowait(reply('hit2', Priority.INTERACTIVE, 'blackjack_bot'))
+
+    dropped = queue.put_dropping(reply('cat', Priority.IMAGE, 'cat_bot'))
+
+    assert dropped.text == 'cat'
+    assert drain(queue) == ['hit1', 'hit2']
+
+
+def test_full_queue_evicts_from_the_busiest_sender_of_the_lowest_class():
+    queue = OutboundQueue(maxsize=4)
+    queue.put_nowait(reply('dog', Priority.IMAGE, 'dog_bot'))
+    queue.put_nowait(reply('cat1', Priority.IMAGE, 'cat_bot'))
+    queue.put_nowait(reply('cat2', Priority.IMAGE, 'cat_bot'))
+    queue.put_nowait(reply('coin', Priority.TEXT, 'coin_bot'))
+
+    dropped = queue.put_dropping(reply('hit', Priority.INTERACTIVE, 'blackjack_bot'))
+
+    assert dropped.text == 'cat1'
+    assert drain(queue) == ['hit', 'coin', 'dog', 'cat2']
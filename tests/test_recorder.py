@@ -0,0 +1,34 @@
+import asyncio
+import gzip
+
+from gamebot.recorder import Recorder, read_recording
+
+
+def test_recording_is_one_gzip_stream_readable_while_open(tmp_path):
+    path = tmp_path / 'recording.jsonl.gz'
+    recorder = Recorder(path)
+
+    async def record():
+        for i in range(50):
+            recorder.record('blhblh', 'messages', [{'text': f'!dice {i}'}])
+            await recorder.flush()
+
+    asyncio.run(record())
+    assert [record['data'][0]['text'] for record in read_recording(path)] == [f'!dice {i}' for i in range(50)]
+
+    recorder.close()
+    # A member per flush would repeat the gzip header for every batch
+    assert path.read_bytes().count(b'\x1f\x8b\x08') == 1
+    assert len(gzip.decompress(path.read_bytes()).splitlines()) == 50
+    assert len(list(read_recording(path))) == 50
+
+
+def test_recording_appends_across_recorders(tmp_path):
+    path = tmp_path / 'recording.jsonl'
+    for source in ['a', 'b']:
+        recorder = Recorder(path)
+        recorder.record(source, 'ack', {})
+        asyncio.run(recorder.flush())
+        recorder.close()
+
+    assert [record['src'] for record in read_recording(path)] == ['a', 'b']
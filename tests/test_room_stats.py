@@ -0,0 +1,67 @@
+import random
+
+from gamebot.bots.stats.room_stats import HOUR, HeavyHitters, RingCounter, RingHeavyHitters, RoomStats
+from gamebot.bots.stats.stats_bot import StatsBot
+
+
+def test_ring_counter_drops_buckets_that_left_the_window():
+    counter = RingCounter(buckets=3, bucket_seconds=10)
+    for ts in [0, 5, 12, 25, 26, 27]:
+        counter.add(ts)
+
+    assert counter.series(now=29) == [(0, 2), (10, 1), (20, 3)]
+    assert counter.total(now=29) == 6
+    assert counter.total(now=29, buckets=1) == 3
+
+    # Bucket 30-39 reuses the slot of bucket 0-9
+    counter.add(31)
+    assert counter.series(now=31) == [(10, 1), (20, 3), (30, 1)]
+    assert counter.total(now=65) == 0
+
+
+def test_ring_counter_ignores_messages_older_than_the_window():
+    counter = RingCounter(buckets=3, bucket_seconds=10)
+    counter.add(35)
+    counter.add(5)
+    counter.add(15)
+
+    assert counter.series(now=35) == [(10, 1), (20, 0), (30, 1)]
+
+
+def test_heavy_hitters_keeps_every_key_above_its_error_bound():
+    rng = random.Random(1)
+    stream = ['alice'] * 300 + ['bob'] * 200 + [f'user{rng.randrange(500)}' for _ in range(1500)]
+    rng.shuffle(stream)
+
+    sketch = HeavyHitters(capacity=9)
+    for key in stream:
+        sketch.add(key)
+
+    bound = len(stream) / (9 + 1)
+    assert len(sketch.counts) <= 9
+    assert 300 - bound <= sketch.counts['alice'] <= 300
+    assert 200 - bound <= sketch.counts['bob'] <= 200
+
+
+def test_heavy_hitters_is_exact_below_capacity():
+    sketch = HeavyHitters(capacity=4)
+    for key in 'aabcccd':
+        sketch.add(key)
+
+    assert sketch.counts == {'a': 2, 'b': 1, 'c': 3, 'd': 1}
+    assert sketch.total == 7
+
+
+def test_ring_heavy_hitters_merges_the_window():
+    hitters = RingHeavyHitters(buckets=2, bucket_seconds=HOUR, capacity=4)
+    for ts, key in [(0, 'old'), (0, 'old'), (HOUR, 'alice'), (HOUR, 'bob'), (2 * HOUR, 'alice')]:
+        hitters.add(ts, key)
+
+    assert hitters.top(now=2 * HOUR, n=5) == [('alice', 2), ('bob', 1)]
+    assert hitters.top(now=2 * HOUR, n=1) == [('alice', 2)]
+
+
+def test_top_without_messages_says_so():
+    bot = StatsBot(subscription=None, topic=None)
+
+    assert bot.top_text(RoomStats(), now=HOUR) == 'No messages in the last 24h yet.'